@@ -0,0 +1,26 @@
+# Key-to-sound dispatch latency with the default and the low-latency mixer settings.
+# Run from the project root:  python benchmarks/audio_latency.py [presses]
+import os
+import sys
+import random
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygame
+from src import config
+from src.audio import SoundBank, LatencyProbe, mixer_settings
+
+if __name__ == "__main__":
+    presses = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    chars = list(config.SOUND_MAP)
+    for low in (False, True):
+        config.LOW_LATENCY = low
+        pygame.mixer.init(**mixer_settings())
+        bank, probe = SoundBank(), LatencyProbe(size=presses)
+        if low: bank.preload()
+        for _ in range(presses):
+            c = random.choice(chars)
+            probe.mark(); s = bank.get(c)
+            if s: s.play()
+            probe.stop()
+        print(f"{'low latency' if low else 'default':12s} {pygame.mixer.get_init()}  {probe.report()}")
+        pygame.mixer.quit()
@@ -0,0 +1,56 @@
+# Keyboard build/recolor benchmark: per-key inline QSS (old ColorKey) vs one shared sheet + paintEvent.
+# Run from the project root:  python benchmarks/keyboard_startup.py [rounds]
+import os
+import sys
+import time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtWidgets import QApplication, QWidget, QGridLayout, QPushButton
+from src import config
+from src.widgets import ColorKey
+
+class InlineStyleKey(QPushButton):
+    # ColorKey as it was: a fresh stylesheet per key and per recolor
+    def __init__(self, char, parent=None):
+        super().__init__(char, parent)
+        self.char = char; self.setFixedSize(45, 45); self.current_color = "#000000"; self.update_style()
+    def set_synesthesia_color(self, hex_color): self.current_color = hex_color; self.update_style()
+    def update_style(self):
+        self.setStyleSheet(f"""
+            QPushButton {{
+                background-color: white; border: 1px solid #bbb; border-radius: 8px;
+                font-size: 20px; color: {self.current_color}; font-weight: bold;
+            }}
+            QPushButton:pressed {{ background-color: #eee; }}
+        """)
+
+def layouts():
+    for chars in config.LAYOUTS_ENG.values(): yield chars
+    for cols in config.LAYOUTS_JP.values(): yield [c for col in cols for c in col if c]
+
+def run(key_cls, shared_style, rounds):
+    colors = config.CRAYON_COLORS
+    build = recolor = 0.0
+    for _ in range(rounds):
+        root = QWidget(); grid = QGridLayout(root)
+        if shared_style: root.setStyleSheet(shared_style)
+        t0 = time.perf_counter(); keys = []
+        for chars in layouts():
+            for i, c in enumerate(chars):
+                k = key_cls(c); k.set_synesthesia_color(colors[i % len(colors)]); grid.addWidget(k, len(keys) // 20, len(keys) % 20); keys.append(k)
+        root.show(); QApplication.processEvents()
+        t1 = time.perf_counter()
+        for i, k in enumerate(keys): k.set_synesthesia_color(colors[(i + 7) % len(colors)])
+        QApplication.processEvents()
+        t2 = time.perf_counter()
+        build += t1 - t0; recolor += t2 - t1
+        root.close(); root.deleteLater(); QApplication.processEvents()
+    return len(keys), build / rounds * 1000, recolor / rounds * 1000
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    with open(os.path.join(config.MODES_DIR, "clean.qss"), encoding="utf-8") as f: app.setStyleSheet(f.read()) # as in main.py
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, cls, style in [("inline QSS per key", InlineStyleKey, None), ("shared QSS + paintEvent", ColorKey, ColorKey.STYLE)]:
+        n, b, r = run(cls, style, rounds)
+        print(f"{name:26s} {n} keys  build+show {b:7.1f} ms  recolor all {r:7.1f} ms")
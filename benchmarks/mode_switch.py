@@ -0,0 +1,36 @@
+# Mode (QSS) switch latency: the whole mode on the application per click (old apply_theme) vs ModeSheets scopes.
+# Every keyboard page is built first, as after a session of use. Latency includes processing the resulting events.
+# Run from the project root:  python benchmarks/mode_switch.py [rounds]
+import os
+import sys
+import time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen"); os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtWidgets import QApplication, QWidget
+from src import config
+from src.loader import read_text
+import main
+
+def timed(fn, rounds):
+    t = time.perf_counter()
+    for _ in range(rounds): fn(); QApplication.processEvents()
+    return (time.perf_counter() - t) / rounds * 1000
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pm = main.ProfileManager(); pm.load_profile("rainbow.json"); pm.current_profile_file = None # never saved
+    w = main.MainWindow(pm); w.show()
+    while w.loader.done < w.loader.total: app.processEvents()
+    for t in w.tabs: w.load_kb(t)
+    w.load_kb("hira"); app.processEvents()
+    texts = {m: read_text(os.path.join(config.MODES_DIR, f"{m}.qss")) for m in w.theme_modes}
+    top = [w.btn_color, w.btn_write, w.btn_bgm, w.btn_mode, w.btn_voice]
+    def old_switch(): # cached text, as apply_theme + set_mode did it
+        w.current_css_idx = (w.current_css_idx + 1) % len(w.theme_modes); app.setStyleSheet(texts[w.theme_modes[w.current_css_idx]])
+        for b in top: b.style().unpolish(b); b.style().polish(b)
+    print(f"{len(w.findChildren(QWidget))} widgets, {sum(map(len, w.kb_keys.values()))} keys")
+    print(f"switch, app stylesheet      {timed(old_switch, rounds):7.2f} ms")
+    app.setStyleSheet(w.modes.base)
+    print(f"switch, scoped ModeSheets   {timed(w.cycle_theme, rounds):7.2f} ms")
+    print(f"set_mode, same mode         {timed(lambda: w.set_mode(w.mode), rounds):7.2f} ms")
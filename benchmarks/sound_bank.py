@@ -0,0 +1,30 @@
+# Sound loading benchmark: one Sound per SOUND_MAP entry (old SoundManager) vs the shared, lazy SoundBank.
+# Run from the project root:  python benchmarks/sound_bank.py
+import os
+import sys
+import time
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygame
+from src import config
+from src.audio import SoundBank
+
+def pcm_bytes(sounds): return sum(s.get_length() * pygame.mixer.get_init()[0] * pygame.mixer.get_init()[2] * 2 for s in sounds)
+
+def per_character():
+    sounds = {}
+    for char, filename in config.SOUND_MAP.items():
+        path = os.path.join(config.SOUNDS_DIR, filename)
+        if os.path.exists(path): sounds[char] = pygame.mixer.Sound(path)
+    return sounds
+
+if __name__ == "__main__":
+    pygame.mixer.init()
+    t0 = time.perf_counter(); old = per_character(); t1 = time.perf_counter()
+    print(f"per character:  {len(old)} Sounds, blocking {1000*(t1-t0):7.1f} ms, PCM {pcm_bytes(old.values())/2**20:6.1f} MiB")
+    t0 = time.perf_counter(); bank = SoundBank(); t1 = time.perf_counter()
+    bank.get("あ"); t2 = time.perf_counter()
+    bank.preload(); t3 = time.perf_counter()
+    unique = [s for s in bank.files.values() if s]
+    print(f"SoundBank:      {len(unique)} Sounds, blocking {1000*(t1-t0):7.1f} ms (first play {1000*(t2-t1):.1f} ms, "
+          f"full background warm {1000*(t3-t2):.1f} ms), PCM {pcm_bytes(unique)/2**20:6.1f} MiB")
@@ -0,0 +1,52 @@
+# Theme switching and thumbnails: decode + scale per click (old change_theme) vs ThemeCache.
+# "cold" is a first click: the PNG is not in Qt's own QPixmapCache yet.
+# Run from the project root:  python benchmarks/theme_switch.py [rounds]
+import os
+import sys
+import time
+import shutil
+import tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap, QBrush, QImage, QPixmapCache
+from PyQt5.QtWidgets import QApplication, QGraphicsScene
+from src import config
+from src.themes import ThemeCache, scaled_image
+from src.papers import paper_image
+
+def timed(fn, rounds):
+    t = time.perf_counter()
+    for _ in range(rounds): fn()
+    return (time.perf_counter() - t) / rounds * 1000
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    scene = QGraphicsScene(0, 0, config.PAPER_W, config.PAPER_H)
+    cache = ThemeCache(); names = cache.files(); paths = [cache.path(n) for n in names]
+    def old_switch():
+        for p in paths: scene.setBackgroundBrush(QBrush(QPixmap(p).scaled(config.PAPER_W, config.PAPER_H)))
+    def old_switch_cold(): QPixmapCache.clear(); old_switch() # first click on each theme (QPixmap(path) caches by file name)
+    def new_switch():
+        for n in names: scene.setBackgroundBrush(QBrush(cache.paper(n)))
+    def old_thumbs():
+        for p in paths: QImage(p).scaled(*config.THEME_THUMB, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    tmp = tempfile.mkdtemp()
+    def new_thumbs():
+        for p in paths: scaled_image(p, *config.THEME_THUMB, True, tmp)
+    t = time.perf_counter(); new_thumbs(); first = (time.perf_counter() - t) * 1000
+    print(f"{len(names)} themes")
+    print(f"switch all, decode+scale, cold      {timed(old_switch_cold, rounds):7.2f} ms")
+    print(f"switch all, decode+scale, warm      {timed(old_switch, rounds):7.2f} ms")
+    print(f"switch all, ThemeCache              {timed(new_switch, rounds):7.2f} ms  ({cache.used / 2**20:.1f} MiB held)")
+    print(f"thumbnails, decode+scale            {timed(old_thumbs, rounds):7.2f} ms")
+    print(f"thumbnails, disk cache (first run)  {first:7.2f} ms")
+    print(f"thumbnails, disk cache              {timed(new_thumbs, rounds):7.2f} ms")
+    procedural = [f"{g}#{i}" for i in range(len(names)) for g in ("fractal", "gradient", "pattern")]
+    def papers(): # per paper; the first pass draws them, the rest read the (generator, seed, size) cache
+        for n in procedural: paper_image(n, int(config.PAPER_W), int(config.PAPER_H), cache_dir=tmp)
+    t = time.perf_counter(); papers(); drawn = (time.perf_counter() - t) * 1000 / len(procedural)
+    print(f"procedural paper, drawn             {drawn:7.2f} ms")
+    print(f"procedural paper, disk cache        {timed(papers, rounds) / len(procedural):7.2f} ms")
+    shutil.rmtree(tmp)
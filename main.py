@@ -6,37 +6,61 @@ import pygame
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QGridLayout, QScrollArea, QPushButton, QLabel, QDialog, 
-    QGraphicsView, QGraphicsScene, QGraphicsLineItem, QGraphicsTextItem, 
-    QMessageBox, QListWidget, QListWidgetItem, QLineEdit, QInputDialog, QRadioButton
+    QGraphicsView, QGraphicsScene, 
+    QMessageBox, QListWidget, QListWidgetItem, QListView, QLineEdit, QInputDialog, QRadioButton, QStackedWidget, QSplashScreen
 )
 from PyQt5.QtCore import Qt, QUrl, QStandardPaths, QRectF, QSize
-from PyQt5.QtGui import QPainter, QColor, QFont, QPixmap, QBrush, QImage, QIcon
+from PyQt5.QtGui import QPainter, QColor, QFont, QPixmap, QBrush, QImage, QKeySequence
 
 try:
     from src import config
     from src.widgets import ColorKey, DraggableSticker, CrayonPalette, PlacedStickerItem
+    from src.letter import LetterItem
+    from src.text_model import LetterText
+    from src.audio import VoicePool, ReadAloud, ToneSynth, LatencyProbe, mixer_settings, voice_bank, voice_packs
+    from src.themes import ThemeCache, ThemeListModel, prune_disk_cache
+    from src.modes import ModeSheets
+    from src.bgm import BgmPlayer, BgmLibrary, BgmListModel, MODES as BGM_MODES
+    from src.loader import AssetLoader, PRIORITY_NOW, PRIORITY_SOON, PRIORITY_LATER
 except ImportError:
     sys.path.append(os.path.abspath("src"))
     import config
     from widgets import ColorKey, DraggableSticker, CrayonPalette, PlacedStickerItem
+    from letter import LetterItem
+    from text_model import LetterText
+    from audio import VoicePool, ReadAloud, ToneSynth, LatencyProbe, mixer_settings, voice_bank, voice_packs
+    from themes import ThemeCache, ThemeListModel, prune_disk_cache
+    from modes import ModeSheets
+    from bgm import BgmPlayer, BgmLibrary, BgmListModel, MODES as BGM_MODES
+    from loader import AssetLoader, PRIORITY_NOW, PRIORITY_SOON, PRIORITY_LATER
 
 # --- (Keep SoundManager, ProfileManager, ProfileDialog as they were) ---
 class SoundManager:
-    def __init__(self):
-        pygame.mixer.init()
-        self.sounds = {}
-        for char, filename in config.SOUND_MAP.items():
-            path = os.path.join(config.SOUNDS_DIR, filename)
-            if os.path.exists(path):
-                try: self.sounds[char] = pygame.mixer.Sound(path)
-                except: pass
-    def play(self, char):
-        if char in self.sounds: self.sounds[char].play()
+    def __init__(self, voice=None):
+        pygame.mixer.init(**mixer_settings()) # Sounds are converted to this format once, when decoded
+        self.voice = voice or config.DEFAULT_VOICE # may be TONE_VOICE; the bank then stays for read aloud
+        self.bank_voice = config.DEFAULT_VOICE if self.voice == config.TONE_VOICE else self.voice
+        self.bank = voice_bank(self.bank_voice) # decoded once per file, on first play or by the asset loader
+        self.synth = ToneSynth()
+        self.voices = VoicePool(); self.probe = LatencyProbe()
+        self.reader = ReadAloud(self.bank) # whole letter as one pre-mixed Sound
+    def play(self, char, color=None):
+        if self.voice == config.TONE_VOICE:
+            if color: self.voices.play(char, self.synth.tone(color)); self.probe.stop()
+            return
+        bank = self.bank # one read, so a swap mid-call can't mix two voices
+        if char in bank.sound_map: self.voices.play(char, bank.get(char)); self.probe.stop()
+    def swap_bank(self, voice, bank):
+        # Called on the GUI thread once the new bank is fully decoded; the old one is evicted
+        old, self.bank, self.bank_voice, self.voice = self.bank, bank, voice, voice
+        self.reader.set_bank(bank)
+        if old is not bank: old.close()
 
 class ProfileManager:
     def __init__(self):
         self.current_profile_file = None
         self.data = {}
+        self.voice = config.DEFAULT_VOICE
     def load_profile(self, filename):
         self.current_profile_file = os.path.join(config.PROFILE_DIR, filename)
         if os.path.exists(self.current_profile_file):
@@ -45,12 +69,15 @@ class ProfileManager:
                     self.data = json.load(f)
             except: self.data = {}
         else: self.data = {}
+        self.voice = self.data.pop("voice", config.DEFAULT_VOICE) # saved in the same file; data keeps only char -> color
         return self.data
     def save_profile(self, color_map):
         if not self.current_profile_file: return
+        data = dict(color_map)
+        if self.voice != config.DEFAULT_VOICE: data["voice"] = self.voice
         try:
             with open(self.current_profile_file, 'w', encoding='utf-8') as f:
-                json.dump(color_map, f, ensure_ascii=False, indent=2)
+                json.dump(data, f, ensure_ascii=False, indent=2)
         except: pass
 
 class ProfileDialog(QDialog):
@@ -146,22 +173,29 @@ class PaperView(QGraphicsView):
             if self.parent(): self.parent().setFocus()
 
 class MainWindow(QMainWindow):
-    def __init__(self, profile_manager, lang="en"):
+    def __init__(self, profile_manager, lang="en", loader=None):
         super().__init__()
-        self.pm = profile_manager; self.sm = SoundManager(); self.lang = lang
+        self.pm = profile_manager; self.sm = SoundManager(self.pm.voice); self.lang = lang
+        self.loader = loader or AssetLoader(); self.loader.loaded.connect(self.on_asset_loaded)
+        midi = config.BGM["source"] == "midi" # synthesized from BGM_MIDI_DIR instead of decoding audio files
+        self.bgm_library = BgmLibrary(config.BGM_MIDI_INDEX, config.BGM_MIDI_DIR) if midi else BgmLibrary(); self.bgm_model = BgmListModel(self.bgm_library, lang) # cached index, no folder scan here
+        self.bgm = BgmPlayer(self.loader, self.bgm_library) # decodes on the loader's workers, crossfades on its own channels
+        self.themes = ThemeCache(); self.theme = None
+        self.modes = ModeSheets(); QApplication.instance().setStyleSheet(self.modes.base) # mode colors go on scopes, see apply_theme
         self.setWindowTitle(f"Synesthetic Keyboard ({lang})")
         self.setMinimumSize(1200, 800)
         self.setProperty("class", "mainwindow")
         
         self.mode = "setting"
         self.color_map = self.pm.data
-        self.text_buffer = []; self.cursor_index = 0
+        self.text_buffer = LetterText(); self.cursor_index = 0
         self.cursor_item = None
         
         self.theme_modes = config.THEME_ORDER
         self.current_css_idx = 0 
         
         self.init_ui()
+        self.preload_assets()
         self.apply_theme()
         self.set_mode("setting")
         self.setFocus()
@@ -173,15 +207,16 @@ class MainWindow(QMainWindow):
         self.main_layout = QVBoxLayout(widget)
         
         # --- Top Bar ---
-        top = QHBoxLayout()
+        self.top_bar = QWidget(); top = QHBoxLayout(self.top_bar); top.setContentsMargins(0, 0, 0, 0)
         self.btn_color = QPushButton(self.tr("btn_color")); self.btn_color.clicked.connect(lambda: self.set_mode("setting"))
         self.btn_write = QPushButton(self.tr("btn_write")); self.btn_write.clicked.connect(lambda: self.set_mode("writing"))
         self.btn_bgm = QPushButton(self.tr("btn_bgm")); self.btn_bgm.clicked.connect(self.open_bgm)
         self.btn_mode = QPushButton(self.tr("btn_mode")); self.btn_mode.clicked.connect(self.cycle_theme)
+        self.btn_voice = QPushButton(); self.btn_voice.clicked.connect(self.cycle_voice); self.update_voice_label()
         
-        for b in [self.btn_color, self.btn_write, self.btn_bgm, self.btn_mode]:
+        for b in [self.btn_color, self.btn_write, self.btn_bgm, self.btn_mode, self.btn_voice]:
             b.setFixedSize(160, 45); b.setProperty("class", "topbar"); b.setFocusPolicy(Qt.NoFocus); top.addWidget(b)
-        self.main_layout.addLayout(top)
+        self.main_layout.addWidget(self.top_bar)
 
         # --- Workspace ---
         self.ws = QWidget(); ws_layout = QHBoxLayout(self.ws)
@@ -190,22 +225,22 @@ class MainWindow(QMainWindow):
         left = QVBoxLayout()
         self.btn_prev = QPushButton(self.tr("btn_preview")); self.btn_prev.setProperty("class", "btn_action")
         self.btn_prev.setFixedSize(140, 50); self.btn_prev.clicked.connect(self.open_preview); self.btn_prev.setFocusPolicy(Qt.NoFocus)
-        left.addWidget(self.btn_prev); left.addWidget(QLabel(self.tr("lbl_theme")))
+        self.btn_read = QPushButton(self.tr("btn_read")); self.btn_read.setProperty("class", "btn_action")
+        self.btn_read.setFixedSize(140, 50); self.btn_read.clicked.connect(lambda: self.sm.reader.play(self.text_buffer.text())); self.btn_read.setFocusPolicy(Qt.NoFocus)
+        left.addWidget(self.btn_prev); left.addWidget(self.btn_read); left.addWidget(QLabel(self.tr("lbl_theme")))
         
-        scroll = QScrollArea() 
-        scroll.setFixedWidth(140); scroll.setWidgetResizable(True); scroll.setProperty("class", "dock")
-        scroll.setFocusPolicy(Qt.NoFocus) # <--- CRITICAL FIX: Prevent scroll area from stealing arrow keys
-        
-        cont = QWidget(); cont.setAttribute(Qt.WA_StyledBackground, True); v = QVBoxLayout(cont); v.setAlignment(Qt.AlignHCenter); v.setSpacing(15)
-        for f in sorted(glob.glob(os.path.join(config.THEME_DIR, "*.png"))):
-            n = os.path.splitext(os.path.basename(f))[0]
-            btn = QPushButton(); btn.setFixedSize(110, 80); btn.setProperty("class", "thumb")
-            btn.setIcon(QIcon(QPixmap(f))); btn.setIconSize(QSize(110, 80)); btn.setStyleSheet("border: none; background: transparent; outline: none;")
-            btn.clicked.connect(lambda _, x=n: self.change_theme(x)); v.addWidget(btn)
-        v.addStretch(); scroll.setWidget(cont); left.addWidget(scroll); ws_layout.addLayout(left)
+        # Theme gallery: a list view over the theme folder, so only visible thumbnails are ever decoded
+        self.theme_model = ThemeListModel(self.themes, self.loader)
+        gallery = QListView(); gallery.setModel(self.theme_model); gallery.setProperty("class", "dock"); gallery.setFixedWidth(140)
+        gallery.setViewMode(QListView.IconMode); gallery.setFlow(QListView.TopToBottom); gallery.setWrapping(False); gallery.setMovement(QListView.Static)
+        gallery.setIconSize(QSize(*config.THEME_THUMB)); gallery.setUniformItemSizes(True); gallery.setSpacing(7)
+        gallery.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        gallery.setFocusPolicy(Qt.NoFocus) # <--- CRITICAL FIX: Prevent the gallery from stealing arrow keys
+        gallery.clicked.connect(lambda i: self.change_theme(i.data(Qt.UserRole))); left.addWidget(gallery); ws_layout.addLayout(left)
 
         # Paper (Center)
         self.scene = QGraphicsScene(0, 0, config.PAPER_W, config.PAPER_H)
+        self.letter = LetterItem(self.text_buffer); self.letter.setZValue(1); self.scene.addItem(self.letter); self.cursor_item = self.letter.cursor
         self.view = PaperView(self.scene, self) # Pass self as parent
         self.view.setFixedSize(config.PAPER_W+4, config.PAPER_H+4)
         ws_layout.addWidget(self.view)
@@ -230,7 +265,7 @@ class MainWindow(QMainWindow):
         self.kb_con = QHBoxLayout(self.kb_container_widget)
         
         # Tabs
-        tabs = QVBoxLayout()
+        self.kb_tabs = QWidget(); tabs = QVBoxLayout(self.kb_tabs); tabs.setContentsMargins(0, 0, 0, 0)
         self.tabs = ["hira", "hira_plus", "kata", "kata_plus", "eng_upper", "eng_lower", "num"]
         self.tab_labels = ["あ","あ+","ア","ア+","A","a", "1"] 
         self.tab_btns = {}
@@ -238,16 +273,18 @@ class MainWindow(QMainWindow):
             l = self.tab_labels[i]
             b = QPushButton(l); b.setFixedSize(50, 40); b.setProperty("class", "tab"); b.setFocusPolicy(Qt.NoFocus)
             b.clicked.connect(lambda _, x=t: self.load_kb(x)); tabs.addWidget(b); self.tab_btns[t] = b
-        tabs.addStretch(); self.kb_con.addLayout(tabs)
+        tabs.addStretch(); self.kb_con.addWidget(self.kb_tabs)
         
         # Grid
         ks = QScrollArea()
-        ks.setWidgetResizable(True); kw = QWidget(); self.kb_grid = QGridLayout(kw)
+        ks.setWidgetResizable(True); self.kb_stack = QStackedWidget(); self.kb_pages = {} # layout -> page, built on first view
+        self.kb_keys = {} # char -> every ColorKey showing it, across all built pages
+        self.kb_stack.setStyleSheet(ColorKey.STYLE)
         ks.setFocusPolicy(Qt.NoFocus) # <--- CRITICAL FIX
-        self.kb_grid.setAlignment(Qt.AlignCenter); ks.setWidget(kw); self.kb_con.addWidget(ks)
+        ks.setWidget(self.kb_stack); self.kb_con.addWidget(ks)
         
         # Punctuation (Right Column)
-        spec = QVBoxLayout()
+        self.kb_special = QWidget(); spec = QVBoxLayout(self.kb_special)
         spec.setAlignment(Qt.AlignCenter) # Center vertically relative to keyboard
         spec.setContentsMargins(10, 0, 10, 0) # "Diminishing Area": Add padding left/right
         spec.setSpacing(15) # Add space between buttons
@@ -258,30 +295,76 @@ class MainWindow(QMainWindow):
             b.clicked.connect(lambda _, x=k: self.type(x))
             spec.addWidget(b)
         
-        self.kb_con.addLayout(spec)
+        self.kb_con.addWidget(self.kb_special)
         
         self.main_layout.addWidget(self.kb_container_widget)
         self.load_kb("hira")
 
+        # Mode sheets are set per scope, never on an ancestor of the keys: a sheet change re-polishes the whole subtree
+        self.dialogs = QWidget(self); self.dialogs.hide() # parent of the dialogs, carrying the whole mode sheet
+        self.style_scopes = {"topbar": [self.top_bar], "workspace": [self.ws], "keyboard": [self.kb_tabs, self.kb_special], "dialog": [self.dialogs]}
+        self.window_bg = self.palette().window().color() # until a mode names one
+
+    def preload_assets(self):
+        # Sounds for the first tab gate the splash, the profile's characters come next; the rest streams in.
+        first = {c for col in config.LAYOUTS_JP["hira"] for c in col if c}
+        files = {}
+        for char, filename in config.SOUND_MAP.items():
+            prio = PRIORITY_NOW if char in first or config.LOW_LATENCY else PRIORITY_SOON if char in self.color_map else PRIORITY_LATER
+            if filename not in files or prio < files[filename][0]: files[filename] = (prio, char)
+        for filename, (prio, char) in files.items(): self.loader.submit(prio, f"sound:{filename}", self.sm.bank.get, char)
+        w, h = int(config.PAPER_W), int(config.PAPER_H) # thumbnails are asked for by the gallery as rows become visible
+        files = self.themes.files() # procedural papers are drawn on click instead
+        if len(files) * w * h * 4 <= self.themes.budget // 2: # papers too, when they all fit: switching never decodes
+            for n in files: self.loader.submit(PRIORITY_LATER, f"paper:{n}", self.themes.image, n, w, h)
+        prio = PRIORITY_LATER if self.bgm_library.tracks() else PRIORITY_SOON # first run: nothing cached to show yet
+        self.loader.submit(prio, "library:bgm", self.bgm_library.scan) # only changed files are hashed and measured
+        self.loader.submit(PRIORITY_LATER, "cache:themes", prune_disk_cache) # scaled papers and thumbnails pile up otherwise
+
+    def on_asset_loaded(self, key, result):
+        kind, name = key.split(":", 1)
+        if result is None: return
+        if kind == "paper": self.themes.put(name, int(config.PAPER_W), int(config.PAPER_H), result)
+        elif kind == "library" and self.bgm_library.update(result): self.bgm_model.reload()
+        elif kind == "voice" and name == self.pm.voice: self.sm.swap_bank(name, result); self.update_voice_label()
+        elif kind == "voice": result.close() # the child moved on to another voice meanwhile
+
+    def cycle_voice(self):
+        names = list(voice_packs()) + [config.TONE_VOICE]
+        nxt = names[(names.index(self.pm.voice) + 1) % len(names)] if self.pm.voice in names else names[0]
+        self.pm.voice = nxt; self.pm.save_profile(self.color_map); self.update_voice_label()
+        if nxt == config.TONE_VOICE or nxt == self.sm.bank_voice: self.sm.voice = nxt; return
+        # Decode the new voice on a worker while the current one keeps playing, then swap on arrival
+        self.loader.submit(PRIORITY_SOON, f"voice:{nxt}", lambda: voice_bank(nxt).preload())
+
+    def update_voice_label(self):
+        label = config.VOICE_NAMES.get(self.pm.voice, {}).get(self.lang, self.pm.voice)
+        self.btn_voice.setText(f"🗣️ {label}"); self.btn_voice.setToolTip(self.tr("btn_voice")) # just the name: "Voice (...)" overflows the 160px button
+
     def cycle_theme(self):
         self.current_css_idx = (self.current_css_idx + 1) % len(self.theme_modes)
         self.apply_theme()
         
     def apply_theme(self):
         mode_key = self.theme_modes[self.current_css_idx]
-        qss_path = os.path.join(config.MODES_DIR, f"{mode_key}.qss")
-        if os.path.exists(qss_path):
-            with open(qss_path, "r", encoding="utf-8") as f:
-                QApplication.instance().setStyleSheet(f.read())
+        for scope, widgets in self.style_scopes.items(): # a scope whose sheet is the same in both modes is left alone
+            sheet = self.modes.sheet(mode_key, scope)
+            for w in widgets:
+                if w.styleSheet() != sheet: w.setStyleSheet(sheet)
+        bg = self.modes.background(mode_key)
+        if bg: self.window_bg = QColor(bg); self.update()
         theme_label = config.THEME_NAMES.get(mode_key, {}).get(self.lang, mode_key)
         self.btn_mode.setText(f"{self.tr('btn_mode')} ({theme_label})")
-        self.set_mode(self.mode)
+
+    def paintEvent(self, event):
+        # The mode's window color, painted here rather than by a QMainWindow rule on the window's own sheet
+        p = QPainter(self); p.fillRect(event.rect(), self.window_bg); p.end()
+        super().paintEvent(event)
 
     def set_mode(self, m):
         self.mode = m
-        self.btn_color.setProperty("active", m=="setting"); self.btn_write.setProperty("active", m=="writing")
-        for b in [self.btn_color, self.btn_write, self.btn_bgm, self.btn_mode]:
-            b.style().unpolish(b); b.style().polish(b)
+        for b, on in ((self.btn_color, m == "setting"), (self.btn_write, m == "writing")):
+            if b.property("active") != on: b.setProperty("active", on); b.style().unpolish(b); b.style().polish(b) # only a button whose state flipped
 
         if m == "setting":
             self.ws.hide(); self.kb_container_widget.show()
@@ -299,39 +382,53 @@ class MainWindow(QMainWindow):
             elif event.key() == Qt.Key_Backspace: self.backspace()
             elif event.key() == Qt.Key_Space: self.type(" ")
             elif event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter: self.type("\n")
+            elif event.matches(QKeySequence.Paste): self.paste(QApplication.clipboard().text())
+
+    def closeEvent(self, event):
+        if config.LATENCY_PROBE: print(f"key-to-sound latency: {self.sm.probe.report()}  voices: {self.sm.voices.stats}")
+        super().closeEvent(event)
 
     def load_kb(self, layout):
-        for i in reversed(range(self.kb_grid.count())): self.kb_grid.itemAt(i).widget().setParent(None)
         for k,b in self.tab_btns.items(): 
             b.setProperty("active", k==layout); b.style().unpolish(b); b.style().polish(b)
+        if layout not in self.kb_pages: self.kb_pages[layout] = self.build_kb_page(layout); self.kb_stack.addWidget(self.kb_pages[layout])
+        self.kb_stack.setCurrentWidget(self.kb_pages[layout])
+
+    def build_kb_page(self, layout):
+        page = QWidget(); grid = QGridLayout(page); grid.setAlignment(Qt.AlignCenter)
+        def key(char):
+            k = ColorKey(char); k.clicked.connect(lambda _,x=char: self.handle(x))
+            if char in self.color_map: k.set_synesthesia_color(self.color_map[char])
+            self.kb_keys.setdefault(char, []).append(k)
+            return k
         chars = config.LAYOUTS_ENG[layout] if "eng" in layout or "num" in layout else []
         if chars:
-            r, c = 0, 0
-            for char in chars:
-                k = ColorKey(char); k.clicked.connect(lambda _,x=char: self.handle(x))
-                if char in self.color_map: k.set_synesthesia_color(self.color_map[char])
-                self.kb_grid.addWidget(k, r, c); c+=1; (c>=10) and (setattr(sys.modules[__name__], 'c', 0) or setattr(sys.modules[__name__], 'r', r+1)); (c>=10) and (setattr(sys.modules[__name__], 'c', 0) or setattr(sys.modules[__name__], 'r', r+1)); 
-                if c>=10: c=0; r+=1
+            for i, char in enumerate(chars): grid.addWidget(key(char), i // 10, i % 10)
         else:
             cols = config.LAYOUTS_JP[layout]
             for ci, col_d in enumerate(cols):
                 for ri, char in enumerate(col_d):
-                    if char:
-                        k = ColorKey(char); k.clicked.connect(lambda _,x=char: self.handle(x))
-                        if char in self.color_map: k.set_synesthesia_color(self.color_map[char])
-                        self.kb_grid.addWidget(k, ri, len(cols)-1-ci)
+                    if char: grid.addWidget(key(char), ri, len(cols)-1-ci)
+        return page
 
     def handle(self, c):
         if self.mode == "setting": self.modal_color(c)
         else: self.type(c)
 
     def type(self, c):
-        self.sm.play(c)
-        self.text_buffer.insert(self.cursor_index, {'char': c, 'color': self.color_map.get(c, "#000")})
+        self.sm.probe.mark(); self.sm.play(c, self.color_map.get(c))
+        self.text_buffer.insert(self.cursor_index, c, self.color_map.get(c, "#000"))
         self.cursor_index += 1; self.render()
 
+    def paste(self, text):
+        text = ''.join(c for c in text.replace("\r\n", "\n") if c == "\n" or c.isprintable())
+        self.text_buffer.insert(self.cursor_index, text, [self.color_map.get(c, "#000") for c in text])
+        self.cursor_index += len(text); self.render()
+
     def backspace(self):
-        if self.cursor_index > 0: self.text_buffer.pop(self.cursor_index-1); self.cursor_index-=1; self.render()
+        if self.cursor_index > 0:
+            self.text_buffer.remove(self.cursor_index-1)
+            self.cursor_index-=1; self.render()
 
     def move_cursor(self, delta):
         self.cursor_index += delta
@@ -339,57 +436,49 @@ class MainWindow(QMainWindow):
         self.render()
 
     def render(self):
-        for i in self.scene.items(): 
-            if isinstance(i, (QGraphicsTextItem, QGraphicsLineItem)) and not isinstance(i, PlacedStickerItem): self.scene.removeItem(i)
-        
-        self.cursor_item = None 
-        x, y = 20, 20; font = QFont("Hiragino Sans", 24)
-        for i, d in enumerate(self.text_buffer):
-            if i==self.cursor_index and self.mode=="writing": 
-                self.cursor_item = self.scene.addLine(x, y, x, y+30, QColor("red"))
-                self.cursor_item.setZValue(3)
-            c = d['char']
-            if c == '\n': x=20; y+=40; continue
-            s = self.scene.addText(c, font); s.setDefaultTextColor(QColor(200,200,200)); s.setPos(x+2, y+2); s.setZValue(1)
-            t = self.scene.addText(c, font); t.setDefaultTextColor(QColor(d['color'])); t.setPos(x, y); t.setZValue(2)
-            x += t.boundingRect().width()
-            if x > config.PAPER_W-40: x=20; y+=40
-            
-        if self.cursor_index == len(self.text_buffer) and self.mode=="writing": 
-            self.cursor_item = self.scene.addLine(x, y, x, y+30, QColor("red"))
-            self.cursor_item.setZValue(3)
+        # LetterItem lays glyphs out incrementally and paints them itself; only the cursor is synced here.
+        self.letter.set_cursor(self.cursor_index, self.mode=="writing")
 
     def modal_color(self, char):
-        d = QDialog(self); d.setWindowTitle(f"{self.tr('modal_color')}{char}"); d.setFixedSize(400, 500)
+        d = QDialog(self.dialogs); d.setWindowTitle(f"{self.tr('modal_color')}{char}"); d.setFixedSize(400, 500)
         l = QVBoxLayout(d); p = QLabel(char); p.setAlignment(Qt.AlignCenter); p.setFont(QFont("Hiragino Sans", 90))
         p.setStyleSheet(f"color: {self.color_map.get(char, '#000')}"); l.addWidget(p)
-        def cb(h): p.setStyleSheet(f"color: {h}"); self.color_map[char]=h; self.pm.save_profile(self.color_map)
+        def cb(h):
+            p.setStyleSheet(f"color: {h}"); self.color_map[char]=h; self.pm.save_profile(self.color_map)
+            self.text_buffer.recolor_char(char, h) # Letter follows the new color, one repaint
+            if self.sm.voice == config.TONE_VOICE: self.sm.play(char, h) # renders only this color's tone
         l.addWidget(CrayonPalette(config.CRAYON_COLORS, cb)); b=QPushButton(self.tr("btn_ok")); b.setProperty("class", "btn_action"); b.clicked.connect(d.accept); l.addWidget(b); d.exec_()
-        for i in range(self.kb_grid.count()):
-            w = self.kb_grid.itemAt(i).widget()
-            if isinstance(w, ColorKey) and w.char == char: w.set_synesthesia_color(self.color_map[char])
+        if char not in self.color_map: return
+        for k in self.kb_keys.get(char, []): k.set_synesthesia_color(self.color_map[char]) # hidden tabs included
 
     def open_bgm(self):
-        d = QDialog(self); d.setWindowTitle(self.tr("modal_music")); d.setFixedSize(300, 400); l=QVBoxLayout(d)
-        lst = QListWidget(); files = sorted(glob.glob(os.path.join(config.BGM_DIR, "*")))
-        for f in files: 
-            n = os.path.basename(f); disp = config.BGM_NAMES.get(n, {}).get(self.lang, n)
-            it = QListWidgetItem(disp); it.setData(Qt.UserRole, n); lst.addItem(it)
-        lst.itemClicked.connect(lambda i: pygame.mixer.music.load(os.path.join(config.BGM_DIR, i.data(Qt.UserRole))) or pygame.mixer.music.play(-1))
-        l.addWidget(lst); b=QPushButton(self.tr("btn_stop")); b.setProperty("class", "btn_action"); b.clicked.connect(pygame.mixer.music.stop); l.addWidget(b); d.exec_()
+        d = QDialog(self.dialogs); d.setWindowTitle(self.tr("modal_music")); d.setFixedSize(300, 400); l=QVBoxLayout(d)
+        lst = QListView(); lst.setUniformItemSizes(True); lst.setModel(self.bgm_model) # rows are drawn only when visible
+        def show_track(name): # the playlist moves on by itself while the dialog is open
+            row = self.bgm_model.row_of(name)
+            if row >= 0: lst.setCurrentIndex(self.bgm_model.index(row))
+            else: lst.clearSelection()
+        show_track(self.bgm.current); self.bgm.track_changed.connect(show_track)
+        lst.clicked.connect(lambda i: self.bgm.play(i.data(Qt.UserRole))) # returns at once; the track fades in once decoded
+        l.addWidget(lst)
+        m = QPushButton(); m.setProperty("class", "btn_action"); l.addWidget(m)
+        def show_mode(): m.setText(f"{self.tr('btn_bgm_mode')} ({config.BGM_MODE_NAMES[self.bgm.mode][self.lang]})")
+        m.clicked.connect(lambda: (self.bgm.set_mode(BGM_MODES[(BGM_MODES.index(self.bgm.mode) + 1) % len(BGM_MODES)]), show_mode())); show_mode()
+        b=QPushButton(self.tr("btn_stop")); b.setProperty("class", "btn_action"); b.clicked.connect(self.bgm.stop); l.addWidget(b); d.exec_()
+        self.bgm.track_changed.disconnect(show_track)
 
     def change_theme(self, n):
-        p = os.path.join(config.THEME_DIR, f"{n}.png")
-        if os.path.exists(p): self.scene.setBackgroundBrush(QBrush(QPixmap(p).scaled(config.PAPER_W, config.PAPER_H)))
+        pm = self.themes.paper(n) # cached: the brush shares the pixmap, nothing is decoded or scaled
+        if pm is not None: self.scene.setBackgroundBrush(QBrush(pm)); self.theme = n
 
     def open_preview(self):
-        d = QDialog(self); d.setWindowTitle(self.tr("btn_preview")); d.setFixedSize(800, 500); d.setStyleSheet("background: #333"); l=QVBoxLayout(d)
+        d = QDialog(self.dialogs); d.setWindowTitle(self.tr("btn_preview")); d.setFixedSize(800, 500); d.setStyleSheet("background: #333"); l=QVBoxLayout(d)
         w, h = int(config.PAPER_W), int(config.PAPER_H)
         
         if self.cursor_item: self.cursor_item.setVisible(False)
         img = QImage(w, h, QImage.Format_ARGB32); img.fill(Qt.transparent)
         p = QPainter(img); self.scene.render(p, QRectF(0,0,w,h), QRectF(0,0,w,h)); p.end()
-        if self.cursor_item: self.cursor_item.setVisible(True)
+        if self.cursor_item: self.cursor_item.setVisible(self.mode=="writing")
         
         lbl = QLabel(); lbl.setPixmap(QPixmap.fromImage(img)); lbl.setAlignment(Qt.AlignCenter); l.addWidget(lbl)
         
@@ -400,9 +489,12 @@ class MainWindow(QMainWindow):
             if self.cursor_item: self.cursor_item.setVisible(False)
             sw, sh = w*2, h*2
             hi = QImage(sw, sh, QImage.Format_ARGB32); hi.fill(Qt.transparent)
-            hp = QPainter(hi); self.scene.render(hp, QRectF(0,0,sw,sh), QRectF(0,0,w,h)); hp.end()
+            paper = self.themes.image(self.theme, sw, sh) if self.theme else None # the paper at full export size, not the screen one upscaled
+            hp = QPainter(hi); brush = self.scene.backgroundBrush()
+            if paper is not None: hp.drawImage(0, 0, paper); self.scene.setBackgroundBrush(QBrush())
+            self.scene.render(hp, QRectF(0,0,sw,sh), QRectF(0,0,w,h)); hp.end(); self.scene.setBackgroundBrush(brush)
             hi.save(path); QApplication.clipboard().setImage(hi)
-            if self.cursor_item: self.cursor_item.setVisible(True)
+            if self.cursor_item: self.cursor_item.setVisible(self.mode=="writing")
             QMessageBox.information(d, self.tr("msg_saved_title"), self.tr("msg_saved_body")+path); d.accept()
         bs.clicked.connect(save); hl.addWidget(bs); l.addLayout(hl); d.exec_()
 
@@ -416,4 +508,13 @@ if __name__ == "__main__":
     pd = ProfileDialog()
     if pd.exec_() == QDialog.Accepted:
         pm = ProfileManager(); pm.load_profile(pd.selected_profile)
-        w = MainWindow(pm, lang=pd.selected_lang); w.show(); sys.exit(app.exec_())
\ No newline at end of file
+        # Splash while the loader decodes what the first screen needs; the window is built meanwhile
+        card = QPixmap(360, 120); card.fill(QColor("#f4f7f6"))
+        splash = QSplashScreen(card); splash.show()
+        loading = config.TEXTS["splash_loading"].get(pd.selected_lang, "...")
+        loader = AssetLoader()
+        loader.progress.connect(lambda done, total: splash.showMessage(f"{loading} {done}/{total}", Qt.AlignCenter))
+        app.processEvents()
+        w = MainWindow(pm, lang=pd.selected_lang, loader=loader)
+        loader.when_ready(lambda: (w.show(), splash.finish(w)))
+        sys.exit(app.exec_())
\ No newline at end of file
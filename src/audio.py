@@ -0,0 +1,230 @@
+import os
+import glob
+import struct
+import time
+import hashlib
+import colorsys
+import threading
+from collections import deque, OrderedDict
+import numpy as np
+import pygame
+try:
+    import config
+    from soundpack import SoundPack
+except ImportError:
+    from src import config
+    from src.soundpack import SoundPack
+
+class SoundBank:
+    """Decodes each sound file once, on first use, and shares it between every character aliasing it.
+
+    'あ', 'ア', 'ぁ' and 'ァ' all map to あ.wav, so they get the same pygame Sound.
+    get() is safe to call from loader threads, so the bank can be warmed in the background.
+    Files are read from the packed bank (config.SOUND_PACK) when there is one, else from SOUNDS_DIR.
+    """
+    def __init__(self, sound_map=None, sounds_dir=None, pack=None, fallback_dir=None):
+        self.sound_map = sound_map or config.SOUND_MAP
+        self.sounds_dir = sounds_dir or config.SOUNDS_DIR
+        self.fallback_dir = fallback_dir # where files this bank lacks come from (partial voice packs)
+        pack = pack or config.SOUND_PACK
+        try: self.pack = SoundPack(pack) if os.path.exists(pack) else None
+        except (OSError, ValueError, struct.error) as e: # stale, empty or truncated: the loose files still work
+            print(f"Ignoring sound pack ({e}); rebuild it with python -m src.soundpack"); self.pack = None
+        self.files = {}               # filename -> Sound, or None if missing/undecodable
+        self.lock = threading.Lock()
+
+    def get(self, char):
+        filename = self.sound_map.get(char)
+        if filename is None: return None
+        if filename not in self.files:
+            sound = self.load(filename) # decode outside the lock so loader threads run in parallel
+            with self.lock: self.files.setdefault(filename, sound)
+        return self.files[filename]
+
+    def load(self, filename):
+        try:
+            if self.pack and filename in self.pack: return pygame.mixer.Sound(file=self.pack.open(filename))
+            path = os.path.join(self.sounds_dir, filename)
+            if self.fallback_dir and not os.path.exists(path): path = os.path.join(self.fallback_dir, filename)
+            return pygame.mixer.Sound(path)
+        except (pygame.error, OSError): return None
+
+    def preload(self, chars=None):
+        for char in chars or self.sound_map: self.get(char)
+        return self
+
+    def close(self):
+        # Drop every decoded Sound (voices still ringing keep theirs alive) and unmap the pack
+        self.files = {}
+        if self.pack:
+            try: self.pack.close()
+            except BufferError: pass # a slice is still being decoded; the mapping goes with the last reference
+            self.pack = None
+
+def voice_packs():
+    # voice name -> (sounds dir, pack path)
+    packs = {config.DEFAULT_VOICE: (config.SOUNDS_DIR, config.SOUND_PACK)}
+    for d in sorted(glob.glob(os.path.join(config.VOICE_PACKS_DIR, "*"))):
+        if os.path.isdir(d): packs[os.path.basename(d)] = (d, os.path.join(d, "sounds.pack"))
+    return packs
+
+def voice_bank(name):
+    packs = voice_packs(); sounds_dir, pack = packs.get(name, packs[config.DEFAULT_VOICE])
+    return SoundBank(sounds_dir=sounds_dir, pack=pack, fallback_dir=None if sounds_dir == config.SOUNDS_DIR else config.SOUNDS_DIR)
+
+class VoicePool:
+    """Reserved mixer channels for key sounds, so fast typing never waits on or loses a channel.
+
+    When every voice is busy the oldest one is stolen; a character already ringing on
+    `per_char` voices retriggers its oldest copy instead of taking another voice.
+    """
+    def __init__(self, voices=None, per_char=None):
+        voices = voices or config.VOICES; self.per_char = per_char or config.VOICES_PER_CHAR
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), voices + 8))
+        pygame.mixer.set_reserved(voices) # Sound.play() elsewhere never lands on these
+        self.channels = [pygame.mixer.Channel(i) for i in range(voices)]
+        self.started = [0.0] * voices; self.owner = [None] * voices
+        self.stats = {"played": 0, "stolen": 0, "dropped": 0}
+
+    def play(self, char, sound):
+        if sound is None: self.stats["dropped"] += 1; return None
+        busy = [i for i, ch in enumerate(self.channels) if ch.get_busy()]
+        same = [i for i in busy if self.owner[i] == char]
+        if len(same) >= self.per_char: i = min(same, key=self.started.__getitem__); self.stats["stolen"] += 1
+        elif len(busy) == len(self.channels): i = min(busy, key=self.started.__getitem__); self.stats["stolen"] += 1
+        else: i = next(i for i, ch in enumerate(self.channels) if not ch.get_busy())
+        self.channels[i].play(sound) # replaces whatever the voice was playing
+        self.started[i] = time.perf_counter(); self.owner[i] = char; self.stats["played"] += 1
+        return self.channels[i]
+
+class ReadAloud:
+    """Pre-mixes the letter's character sounds into one Sound with numpy and plays it on one channel.
+
+    Each WAV is trimmed of leading/trailing silence once; neighbouring characters overlap by
+    `crossfade_ms` with linear ramps, and spaces and new lines add a pause of 4 and 8 x `gap_ms`.
+    Rendered letters are cached by text hash, so replaying an unchanged letter is free.
+    """
+    def __init__(self, bank, gap_ms=None, crossfade_ms=None, cache_size=4):
+        self.bank = bank
+        self.gap_ms = config.READ_ALOUD["gap_ms"] if gap_ms is None else gap_ms
+        self.crossfade_ms = config.READ_ALOUD["crossfade_ms"] if crossfade_ms is None else crossfade_ms
+        self.cache = OrderedDict(); self.cache_size = cache_size
+        self.segments = {}            # filename -> trimmed float32 samples, shape (frames, channels)
+        self.channel = pygame.mixer.Channel(pygame.mixer.get_num_channels() - 1) # the auto-picker reaches it last
+
+    def set_bank(self, bank):
+        self.bank = bank; self.segments = {}; self.cache.clear()
+
+    def segment(self, char):
+        filename = self.bank.sound_map.get(char)
+        if filename not in self.segments:
+            sound = self.bank.get(char)
+            if sound is None: return None
+            a = pygame.sndarray.array(sound).astype(np.float32)
+            a = a.reshape(len(a), -1)
+            loud = np.flatnonzero(np.abs(a).max(axis=1) > config.READ_ALOUD["silence"])
+            self.segments[filename] = a[loud[0]:loud[-1] + 1] if len(loud) else a[:0]
+        return self.segments[filename]
+
+    def render(self, text):
+        key = hashlib.sha1(f"{text}|{self.gap_ms}|{self.crossfade_ms}".encode("utf-8")).hexdigest()
+        if key in self.cache: self.cache.move_to_end(key); return self.cache[key]
+        freq, _, channels = pygame.mixer.get_init()
+        gap, fade = int(freq * self.gap_ms / 1000), int(freq * self.crossfade_ms / 1000)
+        placed, pos, pause = [], 0, 0
+        for char in text:
+            if char == " ": pause += 4 * gap; continue
+            if char == "\n": pause += 8 * gap; continue
+            seg = self.segment(char) if char in self.bank.sound_map else None
+            if seg is None or not len(seg): continue
+            n = len(seg); f = min(fade, n // 2)
+            overlap = 0 if pause or not placed else min(f, len(placed[-1][1]) // 2)
+            if overlap: placed[-1][3] = overlap # the previous one fades out exactly while this one fades in
+            start = pos + pause - overlap
+            placed.append([start, seg, overlap or f, f]); pos = start + n; pause = 0
+        if not placed: return None
+        out = np.zeros((max(s + len(a) for s, a, _, _ in placed), channels), np.float32)
+        for start, seg, fade_in, fade_out in placed:
+            n = len(seg); seg = seg.copy()
+            if fade_in: seg[:fade_in] *= np.linspace(0.0, 1.0, fade_in, dtype=np.float32)[:, None]
+            if fade_out: seg[n-fade_out:] *= np.linspace(1.0, 0.0, fade_out, dtype=np.float32)[:, None]
+            out[start:start + n] += seg
+        pcm = np.clip(out, -32768, 32767).astype(np.int16)
+        sound = pygame.sndarray.make_sound(pcm if channels > 1 else pcm[:, 0])
+        self.cache[key] = sound
+        if len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+        return sound
+
+    def play(self, text):
+        if self.channel.get_busy(): self.channel.stop(); return # second click stops
+        sound = self.render(text)
+        if sound: self.channel.play(sound)
+
+def wavetable(lightness, size=2048, harmonics=8):
+    # One period; lightness 1 is a pure sine, 0 a sawtooth-like tone with every harmonic
+    k = np.arange(1, harmonics + 1)
+    amps = (1.0 - lightness) ** (k - 1) / k
+    phase = np.linspace(0, 2 * np.pi, size, endpoint=False)
+    table = (amps[:, None] * np.sin(k[:, None] * phase)).sum(axis=0)
+    return (table / np.abs(table).max()).astype(np.float32)
+
+class ToneSynth:
+    """Synesthesia tones: hue -> pitch, lightness -> timbre, rendered from a wavetable with numpy.
+
+    One Sound is cached per color, so recoloring a key only renders the tone of its new color.
+    """
+    SCALE = [0, 2, 4, 7, 9] # major pentatonic: any two colors sound fine together
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.TONE
+        self.tones = {}               # hex color -> Sound
+
+    def tone(self, hex_color):
+        if hex_color not in self.tones: self.tones[hex_color] = self.render(hex_color)
+        return self.tones[hex_color]
+
+    def pitch(self, hue, saturation):
+        steps = len(self.SCALE) * self.settings["octaves"]
+        i = int(hue * steps) % steps
+        note = self.settings["base_note"] + 12 * (i // len(self.SCALE)) + self.SCALE[i % len(self.SCALE)]
+        if saturation < 0.1: note = self.settings["base_note"] - 12
+        return 440.0 * 2 ** ((note - 69) / 12)
+
+    def render(self, hex_color):
+        h = hex_color.lstrip("#")
+        if len(h) == 3: h = "".join(c * 2 for c in h)
+        hue, lightness, saturation = colorsys.rgb_to_hls(*(int(h[i:i+2], 16) / 255 for i in (0, 2, 4)))
+        freq, _, channels = pygame.mixer.get_init()
+        table = wavetable(lightness, self.settings["table_size"], self.settings["harmonics"]); size = len(table)
+        n = int(freq * self.settings["duration_ms"] / 1000); t = np.arange(n, dtype=np.float32) / freq
+        wave = table[((np.arange(n) * (self.pitch(hue, saturation) * size / freq)) % size).astype(np.intp)]
+        env = np.minimum(1.0, t / 0.01) * np.exp(-t * 6.0)
+        pcm = (wave * env * self.settings["volume"] * 32767).astype(np.int16)
+        return pygame.sndarray.make_sound(np.repeat(pcm[:, None], channels, axis=1) if channels > 1 else pcm)
+
+class LatencyProbe:
+    """Time from a key press (mark) to the Sound.play() dispatch (stop), in ms, over the last `size` keys."""
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size); self.start = None
+
+    def mark(self): self.start = time.perf_counter()
+
+    def stop(self):
+        if self.start is None: return
+        self.samples.append((time.perf_counter() - self.start) * 1000); self.start = None
+
+    def stats(self):
+        freq, _, _ = pygame.mixer.get_init() or (0, 0, 0)
+        out = {"buffer_ms": 1000 * mixer_buffer() / freq if freq else 0.0}
+        if self.samples:
+            s = sorted(self.samples); n = len(s)
+            out.update(count=n, mean_ms=sum(s) / n, p50_ms=s[n // 2], p95_ms=s[min(n - 1, int(n * 0.95))], max_ms=s[-1])
+        return out
+
+    def report(self):
+        return "  ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in self.stats().items())
+
+def mixer_settings():
+    return config.AUDIO_LOW_LATENCY if config.LOW_LATENCY else config.AUDIO
+
+def mixer_buffer(): return mixer_settings().get("buffer", 512)
@@ -0,0 +1,219 @@
+import os
+import json
+import wave
+import random
+import hashlib
+from collections import OrderedDict
+import pygame
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, Qt, QAbstractListModel, QModelIndex
+try:
+    import config
+    from loader import PRIORITY_SOON, PRIORITY_LATER
+    from midisynth import MidiStream, read_midi
+except ImportError:
+    from src import config
+    from src.loader import PRIORITY_SOON, PRIORITY_LATER
+    from src.midisynth import MidiStream, read_midi
+
+MODES = ["loop", "playlist", "shuffle"]
+INDEX_VERSION = 1
+
+def is_midi(name): return name.lower().endswith(".mid")
+
+# MP3 layer III bitrates (kbps) by version bits: 3 = MPEG-1, 2/0 = MPEG-2/2.5
+BITRATES = {3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+            2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]}
+
+def mp3_duration(path):
+    # From the first frame header: the Xing/Info or VBRI frame count when there is one, else size / bitrate (CBR)
+    with open(path, "rb") as f:
+        head = f.read(10); start = 0
+        if head[:3] == b"ID3": start = 10 + sum((b & 0x7f) << s for b, s in zip(head[6:10], (21, 14, 7, 0)))
+        f.seek(start); buf = f.read(8192)
+    i = next((i for i in range(len(buf) - 4) if buf[i] == 0xFF and buf[i+1] & 0xE0 == 0xE0), None)
+    if i is None: return None
+    h = int.from_bytes(buf[i:i+4], "big")
+    version, layer, br, sr, mode = h >> 19 & 3, h >> 17 & 3, h >> 12 & 15, h >> 10 & 3, h >> 6 & 3
+    if layer != 1 or sr == 3 or version == 1: return None
+    rate = [44100, 48000, 32000][sr] >> (3 - version if version else 2)
+    spf = 1152 if version == 3 else 576
+    x = i + 4 + ((32 if mode != 3 else 17) if version == 3 else (17 if mode != 3 else 9)) # after the side info
+    if buf[x:x+4] in (b"Xing", b"Info") and int.from_bytes(buf[x+4:x+8], "big") & 1:
+        return int.from_bytes(buf[x+8:x+12], "big") * spf / rate
+    if buf[i+36:i+40] == b"VBRI": return int.from_bytes(buf[i+50:i+54], "big") * spf / rate
+    kbps = BITRATES[3 if version == 3 else 2][br]
+    return (os.path.getsize(path) - start - i) * 8 / (kbps * 1000) if kbps else None
+
+def track_duration(path):
+    try:
+        if path.lower().endswith(".wav"):
+            with wave.open(path) as w: return w.getnframes() / w.getframerate()
+        if path.lower().endswith(".mid"): return max((end for _, end, _, _ in read_midi(path)), default=0.0)
+        if path.lower().endswith(".mp3"):
+            d = mp3_duration(path)
+            if d: return d
+        return pygame.mixer.Sound(path).get_length() # OGG or odd MP3: decode once, the index remembers it
+    except (pygame.error, OSError, EOFError, ValueError, IndexError, wave.Error): return None
+
+def track_names(filename):
+    stem = os.path.splitext(filename)[0] # 01_ea.mid is named like 01_ea.mp3
+    for key in (filename, *(k for k in config.BGM_NAMES if os.path.splitext(k)[0] == stem)):
+        if key in config.BGM_NAMES: return config.BGM_NAMES[key]
+    number = filename.split("_", 1)[0].lstrip("0")
+    return {lang: fmt.format(n=number) if number.isdigit() else os.path.splitext(filename)[0]
+            for lang, fmt in config.BGM_DEFAULT_NAME.items()}
+
+def file_sha1(path):
+    with open(path, "rb") as f: return hashlib.file_digest(f, "sha1").hexdigest()
+
+class BgmLibrary:
+    """Persistent index of BGM_DIR: file name -> size, mtime, sha1, duration and display names per language.
+
+    Opening the library is one JSON read. scan() stats the folder and only hashes and measures
+    files whose size or mtime changed (a renamed file is recognised by its hash), so it can run
+    on a loader worker; update() applies the result on the GUI thread and saves it if it changed.
+    """
+    def __init__(self, path=None, bgm_dir=None):
+        self.path = path or config.BGM_INDEX; self.bgm_dir = bgm_dir or config.BGM_DIR
+        self.entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f: data = json.load(f)
+            if data.get("version") == INDEX_VERSION: self.entries = data["tracks"]
+        except (OSError, ValueError, KeyError): pass
+        self.names = sorted(self.entries)
+
+    def tracks(self): return self.names
+
+    def scan(self):
+        old = self.entries; by_hash = {e["sha1"]: e for e in old.values()}
+        entries = {}
+        for f in os.scandir(self.bgm_dir):
+            if not f.is_file() or not f.name.lower().endswith(config.BGM_EXTS): continue
+            st = f.stat(); e = old.get(f.name)
+            if not (e and e["size"] == st.st_size and e["mtime"] == st.st_mtime_ns):
+                sha1 = file_sha1(f.path); known = by_hash.get(sha1)
+                e = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha1": sha1,
+                     "duration": known["duration"] if known else track_duration(f.path)}
+            entries[f.name] = dict(e, names=track_names(f.name)) # names follow config edits without a rescan
+        return entries
+
+    def update(self, entries):
+        if entries == self.entries: return False
+        self.entries = entries; self.names = sorted(entries)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump({"version": INDEX_VERSION, "tracks": entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        return True
+
+class BgmListModel(QAbstractListModel):
+    """The library as a list model; with QListView.setUniformItemSizes only the visible rows are ever asked for."""
+    def __init__(self, library, lang, parent=None):
+        super().__init__(parent)
+        self.library = library; self.lang = lang; self.rows = library.tracks()
+
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        name = self.rows[index.row()]
+        if role == Qt.UserRole: return name
+        if role != Qt.DisplayRole: return None
+        e = self.library.entries.get(name, {}); title = e.get("names", {}).get(self.lang, name); d = e.get("duration")
+        return f"{title}  {int(d) // 60}:{int(d) % 60:02d}" if d else title
+
+    def row_of(self, name): return self.rows.index(name) if name in self.rows else -1
+
+    def reload(self):
+        self.beginResetModel(); self.rows = self.library.tracks(); self.endResetModel()
+
+class BgmPlayer(QObject):
+    """Background music on two mixer channels, so one track can crossfade into the next.
+
+    Tracks are decoded to Sounds on the asset loader's workers, never on the GUI thread. The next
+    track (the same one in "loop" mode) is decoded while the current one plays and faded in
+    `crossfade_ms` before it ends. Only `keep` decoded tracks are held: current and next.
+    .mid tracks are not decoded at all: a MidiStream synthesizes them chunk by chunk as they play.
+    """
+    track_changed = pyqtSignal(str)   # file name, "" when stopped
+
+    def __init__(self, loader, library, mode=None, keep=2):
+        super().__init__()
+        self.loader = loader; self.loader.loaded.connect(self.on_loaded); self.library = library
+        self.mode = mode or config.BGM["mode"]; self.keep = keep
+        self.decoded = OrderedDict()  # file name -> Sound
+        self.pending = set()          # file names on a worker
+        self.bag = []                 # shuffle: tracks not played yet this round
+        self.current = self.next = self.wanted = None
+        n = pygame.mixer.get_num_channels() # ReadAloud has the last channel
+        self.channels = [pygame.mixer.Channel(n - 2), pygame.mixer.Channel(n - 3)]; self.active = 0
+        self.streams = [None, None]   # MidiStream on each channel, for .mid tracks
+        self.timer = QTimer(self); self.timer.setSingleShot(True); self.timer.timeout.connect(self.advance)
+
+    def decode(self, name, priority=PRIORITY_SOON):
+        if name in self.decoded or name in self.pending or is_midi(name): return # MIDI is synthesized as it plays
+        self.pending.add(name)
+        self.loader.submit(priority, f"bgm:{name}", pygame.mixer.Sound, os.path.join(self.library.bgm_dir, name))
+
+    def on_loaded(self, key, result):
+        kind, name = key.split(":", 1)
+        if kind != "bgm": return
+        self.pending.discard(name)
+        if result is None:
+            if name == self.wanted: self.wanted = None # undecodable: keep playing what we have
+            return
+        self.decoded[name] = result
+        if name == self.wanted: self.start(name)
+        self.trim()
+
+    def trim(self):
+        extra = [n for n in self.decoded if n not in (self.current, self.next, self.wanted)]
+        for n in extra[:max(0, len(self.decoded) - (self.keep if self.current else 0))]: del self.decoded[n]
+
+    def pick_next(self, name):
+        names = self.library.tracks()
+        if not names or self.mode == "loop": return name
+        if self.mode == "shuffle":
+            self.bag = [n for n in self.bag if n != name and n in names]
+            if not self.bag: self.bag = [n for n in names if n != name] or [name]; random.shuffle(self.bag)
+            return self.bag.pop()
+        return names[(names.index(name) + 1) % len(names)] if name in names else names[0]
+
+    def play(self, name):
+        self.wanted = name
+        if name in self.decoded or is_midi(name): self.start(name)
+        else: self.decode(name) # starts from on_loaded
+
+    def start(self, name):
+        fade = config.BGM["crossfade_ms"] if self.current else 0
+        slot = self.active ^ 1; ch = self.channels[slot]
+        if self.streams[slot]: self.streams[slot].stop(); self.streams[slot] = None # still fading from two tracks ago
+        ch.set_volume(config.BGM["volume"])
+        if is_midi(name):
+            try: self.streams[slot] = MidiStream(os.path.join(self.library.bgm_dir, name), ch, fade)
+            except (OSError, ValueError, IndexError): self.wanted = None; return # unreadable: keep playing what we have
+            length = self.streams[slot].duration()
+        else:
+            sound = self.decoded[name]; self.decoded.move_to_end(name)
+            ch.play(sound, fade_ms=fade); length = sound.get_length()
+        old, self.active = self.active, slot
+        if self.streams[old]: self.streams[old].fade_out(fade) if fade else self.streams[old].stop()
+        elif fade: self.channels[old].fadeout(fade)
+        else: self.channels[old].stop()
+        self.current, self.wanted = name, None
+        self.next = self.pick_next(name); self.decode(self.next, PRIORITY_LATER)
+        self.timer.start(max(0, int(length * 1000) - config.BGM["crossfade_ms"]))
+        self.trim(); self.track_changed.emit(name)
+
+    def advance(self):
+        if self.next: self.play(self.next)
+
+    def set_mode(self, mode):
+        self.mode = mode; self.bag = []
+        if self.current: self.next = self.pick_next(self.current); self.decode(self.next, PRIORITY_LATER); self.trim()
+
+    def stop(self):
+        self.timer.stop()
+        for i, ch in enumerate(self.channels):
+            if self.streams[i]: self.streams[i].stop(); self.streams[i] = None
+            ch.stop()
+        self.current = self.next = self.wanted = None; self.decoded.clear()
+        self.track_changed.emit("")
@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+try:
+    import config
+except ImportError:
+    from src import config
+
+# Spec (config.BGM_SPECS): {"tracks": {"07_be": {"tempo": 42, "time": "4/4", "repeat": 4,
+#     "sections": {"A": [["E4", 1.0], ...], "B": [...]}, "form": ["A", "B"]}}}
+# A note is [pitch, quarterLength]; the pitch can also be a list (chord) or "r" (rest).
+# The track key is the output file name: 07_be -> BGM_MIDI_DIR/07_be.mid and BGM_DIR/07_be.ogg.
+MANIFEST = ".bgmgen.json"     # in the MIDI folder: track -> hash of what produced its files
+GENERATOR_VERSION = 1         # bump when build_stream() or render() change their output
+FORMATS = {"wav": ".wav", "oga": ".ogg", "flac": ".flac"} # FluidSynth -T file types
+
+def spec_hash(spec, settings):
+    blob = json.dumps({"spec": spec, "render": settings, "version": GENERATOR_VERSION}, sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def build_stream(spec):
+    from music21 import stream, note, chord, tempo, meter, instrument
+    s = stream.Stream()
+    if spec.get("instrument"): s.append(instrument.fromString(spec["instrument"]))
+    s.append(meter.TimeSignature(spec.get("time", "4/4")))
+    s.append(tempo.MetronomeMark(number=spec.get("tempo", 60)))
+    for _ in range(spec.get("repeat", 1)):
+        for section in spec.get("form", list(spec["sections"])):
+            for pitch, length in spec["sections"][section]:
+                n = note.Rest() if pitch == "r" else chord.Chord(pitch) if isinstance(pitch, list) else note.Note(pitch)
+                n.quarterLength = length; s.append(n)
+    return s
+
+def write_midi(spec, path):
+    from music21 import midi
+    mf = midi.translate.streamToMidiFile(build_stream(spec))
+    mf.open(path, "wb"); mf.write(); mf.close()
+
+def render(midi_path, out_path, soundfont, rate, fmt):
+    # FluidSynth offline (-n no MIDI in, -i no shell, -F to file): as fast as the CPU allows, no audio device
+    subprocess.run(["fluidsynth", "-ni", "-g", "0.8", "-r", str(rate), "-T", fmt, "-F", out_path, soundfont, midi_path],
+                   check=True, capture_output=True)
+
+def job(name, spec, out_dir, midi_dir, settings):
+    # Runs in a worker process: spec -> music21 stream -> MIDI -> audio
+    t = time.perf_counter()
+    midi_path = os.path.join(midi_dir, f"{name}.mid"); write_midi(spec, midi_path)
+    if settings["soundfont"]:
+        render(midi_path, os.path.join(out_dir, name + FORMATS[settings["format"]]), settings["soundfont"], settings["rate"], settings["format"])
+    return time.perf_counter() - t
+
+def outputs(name, out_dir, midi_dir, settings):
+    files = [os.path.join(midi_dir, f"{name}.mid")]
+    if settings["soundfont"]: files.append(os.path.join(out_dir, name + FORMATS[settings["format"]]))
+    return files
+
+def generate(specs=None, out_dir=None, midi_dir=None, soundfont=None, rate=44100, fmt="oga", workers=None, force=False, log=print):
+    specs = specs or config.BGM_SPECS; out_dir = out_dir or config.BGM_DIR; midi_dir = midi_dir or config.BGM_MIDI_DIR
+    with open(specs, "r", encoding="utf-8") as f: tracks = json.load(f)["tracks"]
+    os.makedirs(out_dir, exist_ok=True); os.makedirs(midi_dir, exist_ok=True)
+    manifest_path = os.path.join(midi_dir, MANIFEST)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f: manifest = json.load(f)
+    except (OSError, ValueError): manifest = {}
+    # The soundfont's size and mtime stand in for its content, so swapping it re-renders everything
+    sf = os.stat(soundfont) if soundfont else None
+    settings = {"soundfont": soundfont, "sf_stamp": [sf.st_size, sf.st_mtime_ns] if sf else None, "rate": rate, "format": fmt}
+    hashes = {name: spec_hash(spec, settings) for name, spec in tracks.items()}
+    todo = [name for name in tracks if force or manifest.get(name) != hashes[name]
+            or not all(map(os.path.exists, outputs(name, out_dir, midi_dir, settings)))]
+    for name in tracks:
+        if name not in todo: log(f"{name}: unchanged")
+    failed = []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(job, name, tracks[name], out_dir, midi_dir, settings): name for name in todo}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try: secs = fut.result()
+            except Exception as e: # one bad spec or render must not stop the batch
+                failed.append(name); log(f"{name}: FAILED {getattr(e, 'stderr', b'') or e}"); continue
+            manifest[name] = hashes[name]; log(f"{name}: {secs:.1f} s")
+            with open(manifest_path, "w", encoding="utf-8") as f: json.dump(manifest, f, indent=1, sort_keys=True) # an interrupted run keeps what finished
+    return len(todo) - len(failed), len(tracks) - len(todo), failed
+
+if __name__ == "__main__":
+    # python -m src.bgmgen [--soundfont FluidR3_GM.sf2] [--format oga] [--workers N] [--force]
+    p = argparse.ArgumentParser(description="Generate BGM from a music21 spec: MIDI always, audio when a soundfont is given.")
+    p.add_argument("--specs", default=config.BGM_SPECS)
+    p.add_argument("--out", default=config.BGM_DIR, help="audio folder")
+    p.add_argument("--midi", default=config.BGM_MIDI_DIR, help="MIDI folder")
+    p.add_argument("--soundfont", help="SF2 file for FluidSynth; without it only MIDI is written")
+    p.add_argument("--rate", type=int, default=44100)
+    p.add_argument("--format", choices=list(FORMATS), default="oga")
+    p.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    p.add_argument("--force", action="store_true", help="ignore the spec-hash cache")
+    a = p.parse_args()
+    try: import music21
+    except ImportError: sys.exit("music21 is needed: pip install -r requirements.txt")
+    if a.soundfont and not shutil.which("fluidsynth"): sys.exit("fluidsynth is needed to render audio (or leave out --soundfont for MIDI only)")
+    t = time.perf_counter()
+    built, cached, failed = generate(a.specs, a.out, a.midi, a.soundfont, a.rate, a.format, a.workers, a.force)
+    print(f"Built {built}, unchanged {cached}, failed {len(failed)} in {time.perf_counter() - t:.1f} s")
+    sys.exit(1 if failed else 0)
@@ -11,13 +11,23 @@ MODES_DIR = os.path.join(ASSETS_DIR, 'modes')
 BGM_DIR = os.path.join(ASSETS_DIR, 'bgm')
 SOUNDS_DIR = os.path.join(ASSETS_DIR, 'sounds')
 PROFILE_DIR = os.path.join(ASSETS_DIR, 'profiles')
-
-for d in [ASSETS_DIR, THEME_DIR, MODES_DIR, BGM_DIR, SOUNDS_DIR, PROFILE_DIR]:
+SOUND_PACK = os.path.join(ASSETS_DIR, 'sounds.pack') # optional, built from SOUNDS_DIR by `python -m src.soundpack`
+VOICE_PACKS_DIR = os.path.join(ASSETS_DIR, 'voices') # extra voices: one folder per voice, same file names as SOUNDS_DIR
+BGM_INDEX = os.path.join(ASSETS_DIR, 'bgm_index.json') # BGM library cache, rebuilt incrementally at startup
+BGM_SPECS = os.path.join(ASSETS_DIR, 'bgm_specs.json') # music21 track specs for `python -m src.bgmgen`
+BGM_MIDI_DIR = os.path.join(ASSETS_DIR, 'bgm_midi') # MIDI written by src.bgmgen, played when BGM["source"] is "midi"
+BGM_MIDI_INDEX = os.path.join(ASSETS_DIR, 'bgm_midi_index.json')
+THEME_CACHE_DIR = os.path.join(ASSETS_DIR, 'cache', 'themes') # pre-scaled theme papers and thumbnails, by source hash
+
+for d in [ASSETS_DIR, THEME_DIR, MODES_DIR, BGM_DIR, SOUNDS_DIR, PROFILE_DIR, VOICE_PACKS_DIR]:
     os.makedirs(d, exist_ok=True)
 
 # Dimensions
 WINDOW_W, WINDOW_H = 800, 800
 PAPER_W, PAPER_H = 500, 250
+THEME_THUMB = (110, 80)
+THEME_CACHE = {"budget_mb": 24, "disk_mb": 128} # decoded theme pixmaps kept in memory; THEME_CACHE_DIR size cap
+PROCEDURAL_PAPERS = {"count": 1000} # per generator (fractal, gradient, pattern), listed after the theme files
 
 # Sticker List
 STICKERS = ["🦄","🌈","✨","🍄","🐞","🌸","⭐","🎵","❤️","🚀","🐱","🐶","🍦","🎈","🎂", "👻", "🎃", "🚗", "✈️", "🦕"]
@@ -61,6 +71,12 @@ TEXTS = {
         "pt": "Por favor selecione um perfil!"
     },
 
+    "splash_loading": {
+        "en": "Loading sounds...",
+        "jp": "じゅんびちゅう...",
+        "pt": "Carregando sons..."
+    },
+
     # Main Window Top Bar
     "btn_color": {
         "en": "🎨 Color Set",
@@ -81,6 +97,11 @@ TEXTS = {
         "en": "🎨 Mode",
         "jp": "🎨 きせかえ",
         "pt": "🎨 Modo"},
+    "btn_voice": {
+        "en": "🗣️ Voice",
+        "jp": "🗣️ こえ",
+        "pt": "🗣️ Voz"
+    },
 
     # Main Window Tools
     "lbl_theme": {
@@ -88,6 +109,11 @@ TEXTS = {
         "jp": "はいけい",
         "pt": "Temas"
     },
+    "btn_read": {
+        "en": "🔊 Read",
+        "jp": "🔊 よみあげ",
+        "pt": "🔊 Ler"
+    },
     "btn_preview": {
         "en": "👁️ Preview",
         "jp": "👁️ みてみる",
@@ -110,6 +136,11 @@ TEXTS = {
         "jp": "おんがくをえらぶ",
         "pt": "Escolher Música"
     },
+    "btn_bgm_mode": {
+        "en": "🔀 Mode",
+        "jp": "🔀 ならびかた",
+        "pt": "🔀 Modo"
+    },
     "btn_stop": {
         "en": "Stop Music",
         "jp": "とめる",
@@ -161,30 +192,45 @@ PROFILE_NAMES = {
     }
 }
 
-# Map filename (WITH extension) -> Display Name
+# Background music: tracks crossfade into each other; mode is "loop", "playlist" or "shuffle"
+# source "midi" plays BGM_MIDI_DIR through the built-in synth: a few KB on disk, two small chunks in RAM
+BGM = {"mode": "playlist", "crossfade_ms": 2500, "volume": 1.0, "source": "audio"}
+BGM_EXTS = (".mp3", ".ogg", ".wav", ".mid")
+BGM_MIDI = {"chunk_ms": 250, "brightness": 0.6, "decay": 1.5, "release_ms": 300, "volume": 0.4}
+BGM_MODE_NAMES = {
+    "loop": {"en": "Repeat", "jp": "くりかえし", "pt": "Repetir"},
+    "playlist": {"en": "In order", "jp": "じゅんばん", "pt": "Em ordem"},
+    "shuffle": {"en": "Shuffle", "jp": "シャッフル", "pt": "Aleatório"}
+}
+
+# Map filename (WITH extension) -> Display Name; other files are shown as BGM_DEFAULT_NAME with their number
 BGM_NAMES = {
-    "01_earth_root.wav": {
+    "01_ea.mp3": {
         "en": "Earth",
         "jp": "だいち",
         "pt": "Terra"
     },
-    "02_flow_state.wav": {
+    "02_fl.mp3": {
         "en": "Flowing",
         "jp": "ながれ",
         "pt": "Fluindo"
     },
-    "03_solar_clarity.mp3": {
+    "03_cl.mp3": {
         "en": "Clarity",
         "jp": "ひかり",
         "pt": "Claridade"
-    },
-    "04_cloud_dream.mp3": {
-        "en": "Dream",
-        "jp": "ゆめ",
-        "pt": "Sonho"
     }
     # Add your real BGM filenames here!
 }
+BGM_DEFAULT_NAME = {"en": "Music {n}", "jp": "おんがく {n}", "pt": "Música {n}"}
+
+# Voice packs: "voicevox" is SOUNDS_DIR, the others are folder names in VOICE_PACKS_DIR
+DEFAULT_VOICE = "voicevox"
+TONE_VOICE = "tones" # not a pack: each character plays a tone synthesized from its color
+VOICE_NAMES = {
+    "voicevox": {"en": "VOICEVOX", "jp": "VOICEVOX", "pt": "VOICEVOX"},
+    "tones": {"en": "Color tones", "jp": "いろのおと", "pt": "Tons de cor"}
+}
 
 # These keys match the filenames: clean.qss, dark.qss...
 THEME_NAMES = {
@@ -246,6 +292,23 @@ JAPANESE_COLORS = {
 
 CRAYON_COLORS = list(JAPANESE_COLORS.keys())
 
+# --- AUDIO ---
+# pygame mixer settings. A smaller buffer shortens the delay between a key press and its sound,
+# but can crackle on slow machines. LOW_LATENCY runs the mixer at the WAVs' own rate (24 kHz),
+# refuses format changes from SDL and decodes the whole bank before the window opens.
+AUDIO = {"frequency": 44100, "size": -16, "channels": 2, "buffer": 512}
+AUDIO_LOW_LATENCY = {"frequency": 24000, "size": -16, "channels": 2, "buffer": 128, "allowedchanges": 0}
+LOW_LATENCY = False
+LATENCY_PROBE = False # print key-to-sound timings and voice stats when the window closes
+VOICES = 12           # mixer channels reserved for key sounds
+VOICES_PER_CHAR = 2   # copies of one character that may ring at once
+# Read aloud: pause unit (x4 for a space, x8 for a new line), crossfade between neighbouring
+# characters, and the sample level below which a WAV's head/tail counts as silence.
+READ_ALOUD = {"gap_ms": 60, "crossfade_ms": 20, "silence": 300}
+# Color tones: hue picks a note of the major pentatonic scale across `octaves` from `base_note` (MIDI),
+# lightness picks the timbre (dark = rich, light = pure); grey colors hum an octave lower.
+TONE = {"base_note": 60, "octaves": 2, "duration_ms": 400, "table_size": 2048, "harmonics": 8, "volume": 0.35}
+
 # --- SOUND MAPPING ---
 SOUND_MAP = {
     # --- JAPANESE (GOJUON) ---
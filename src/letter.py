@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+from PyQt5.QtWidgets import QGraphicsItem, QGraphicsLineItem
+from PyQt5.QtCore import QRectF, QPointF
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QStaticText
+try:
+    import config
+except ImportError:
+    from src import config
+
+MARGIN = 20          # left/top margin of the writing area
+LINE_H = 40          # distance between two lines
+WRAP_X = config.PAPER_W - 40
+DOC_MARGIN = 4       # QGraphicsTextItem's document margin, kept so letter spacing looks the same as before
+SHADOW = QColor(200, 200, 200)
+
+class LetterItem(QGraphicsItem):
+    """Paints the whole letter in one item: cached QStaticText per character, batched by color.
+
+    Subscribes to a LetterText model. pens[i] is the pen position before glyph i
+    (pens[-1] is the end of the letter), so an edit only walks forward until the
+    new pen matches the cached one.
+    """
+    def __init__(self, text, font=None, parent=None):
+        super().__init__(parent)
+        self.text = text; text.subscribe(self.on_text_changed)
+        self.font = font or QFont("Hiragino Sans", 24)
+        self.metrics = QFontMetricsF(self.font)
+        self.pens = [(MARGIN, MARGIN)]
+        self.widths = {}              # char -> advance, measured once
+        self.statics = {}             # char -> QStaticText, laid out once
+        self.colors = {}              # hex -> QColor
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.cursor = QGraphicsLineItem(MARGIN, MARGIN, MARGIN, MARGIN+30, self)
+        self.cursor.setPen(QColor("red")); self.cursor.setVisible(False)
+
+    def boundingRect(self): return QRectF(0, 0, config.PAPER_W, config.PAPER_H)
+
+    def _glyph(self, char):
+        if char not in self.statics:
+            st = QStaticText(char); st.prepare(font=self.font); self.statics[char] = st
+            self.widths[char] = self.metrics.horizontalAdvance(char) + 2*DOC_MARGIN
+        return self.statics[char]
+
+    def on_text_changed(self, kind, index, count):
+        if kind == "insert":
+            for i in range(index, index + count):
+                char = self.text.char_at(i)
+                if char != '\n': self._glyph(char)
+            self.pens[index:index] = [self.pens[index]] * count
+            self.relayout(index, self.pens[index], index + count - 1)
+        elif kind == "remove":
+            start = self.pens[index]; old = max(y for _, y in self.pens[index:index + count] + [self.pens[-1]]) # where the gone glyphs were
+            del self.pens[index:index + count]
+            self.relayout(index, start, index - 1, old)
+        elif kind == "recolor": self.update()
+
+    def relayout(self, start, pen, dirty_until, old_bottom=0):
+        # Glyphs past `dirty_until` whose cached pen already matches are in place, and so is everything after them.
+        # The repaint reaches the lowest old position too, so lines that moved up leave no glyphs behind.
+        x, y = pen; top = bottom = y
+        for i in range(start, len(self.text)):
+            if i > dirty_until and self.pens[i] == (x, y): break
+            old_bottom = max(old_bottom, self.pens[i][1]); self.pens[i] = (x, y); bottom = y
+            char = self.text.char_at(i)
+            if char == '\n': x = MARGIN; y += LINE_H; continue
+            x += self.widths[char]
+            if x > WRAP_X: x = MARGIN; y += LINE_H
+        else: old_bottom = max(old_bottom, self.pens[-1][1]); self.pens[-1] = (x, y)
+        self.update(QRectF(0, top, config.PAPER_W, max(bottom, old_bottom) - top + LINE_H + DOC_MARGIN*2))
+
+    def set_cursor(self, index, visible=True):
+        x, y = self.pens[index]
+        self.cursor.setLine(x, y, x, y+30); self.cursor.setVisible(visible)
+
+    def paint(self, painter, option, widget=None):
+        exposed = option.exposedRect
+        # Pens go down the page in order, so the exposed lines are one slice of the letter
+        n = len(self.text); line = lambda pen: pen[1]
+        lo = bisect_left(self.pens, exposed.top() - LINE_H, 0, n, key=line)
+        hi = bisect_right(self.pens, exposed.bottom(), lo, n, key=line)
+        runs = {}
+        for start, end, color in self.text.runs(lo, hi):
+            batch = runs.setdefault(color, [])
+            for i in range(start, end):
+                x, y = self.pens[i]; char = self.text.char_at(i)
+                if char != '\n': batch.append((x + DOC_MARGIN, y + DOC_MARGIN, self.statics[char]))
+        painter.setFont(self.font)
+        painter.setPen(SHADOW)
+        for run in runs.values():
+            for x, y, st in run: painter.drawStaticText(QPointF(x+2, y+2), st)
+        for color, run in runs.items():
+            if color not in self.colors: self.colors[color] = QColor(color)
+            painter.setPen(self.colors[color])
+            for x, y, st in run: painter.drawStaticText(QPointF(x, y), st)
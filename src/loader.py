@@ -0,0 +1,57 @@
+import itertools
+import queue
+import threading
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Lower runs first
+PRIORITY_NOW = 0      # needed before the window is shown: current tab and profile sounds
+PRIORITY_SOON = 1     # visible right away but can pop in: thumbnails, voice swaps, a first BGM scan
+PRIORITY_LATER = 2    # everything else
+
+class AssetLoader(QObject):
+    """Runs asset jobs on a small pool of worker threads, most urgent first.
+
+    Results come back on the GUI thread through `loaded(key, result)`; `progress(done, total)`
+    feeds the splash. Jobs must not touch widgets or QPixmap (decode to QImage instead).
+    """
+    loaded = pyqtSignal(str, object)
+    progress = pyqtSignal(int, int)
+    ready = pyqtSignal()              # every PRIORITY_NOW job submitted so far has finished
+    job_done = pyqtSignal(int, str, object)
+
+    def __init__(self, workers=2, parent=None):
+        super().__init__(parent)
+        self.jobs = queue.PriorityQueue(); self.order = itertools.count()
+        self.workers = workers; self.threads = []
+        self.done = self.total = self.urgent = 0
+        self.job_done.connect(self.on_job_done) # queued: emitted from workers, handled here
+
+    def submit(self, priority, key, fn, *args):
+        if not self.threads:
+            self.threads = [threading.Thread(target=self.work, daemon=True) for _ in range(self.workers)]
+            for t in self.threads: t.start()
+        self.total += 1; self.urgent += priority <= PRIORITY_NOW
+        self.jobs.put((priority, next(self.order), key, fn, args))
+
+    def work(self):
+        while True:
+            priority, _, key, fn, args = self.jobs.get()
+            try: result = fn(*args)
+            except Exception: # the job's owner sees None; the reason goes to the console
+                print(f"Asset job {key} failed:"); traceback.print_exc(); result = None
+            self.job_done.emit(priority, key, result)
+
+    def on_job_done(self, priority, key, result):
+        self.done += 1; self.progress.emit(self.done, self.total)
+        self.loaded.emit(key, result)
+        if priority <= PRIORITY_NOW:
+            self.urgent -= 1
+            if not self.urgent: self.ready.emit()
+
+    def when_ready(self, fn):
+        if self.urgent: self.ready.connect(fn)
+        else: fn()
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8") as f: return f.read()
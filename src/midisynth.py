@@ -0,0 +1,127 @@
+import time
+import struct
+import threading
+import numpy as np
+import pygame
+try:
+    import config
+    from audio import wavetable
+except ImportError:
+    from src import config
+    from src.audio import wavetable
+
+def varlen(data, pos):
+    value = 0
+    while True:
+        b = data[pos]; pos += 1; value = value << 7 | b & 0x7F
+        if not b & 0x80: return value, pos
+
+def read_midi(path):
+    """Notes of a Standard MIDI File as (start s, end s, key, velocity), sorted by start, with the tempo map applied.
+
+    Only what the synth plays is kept: note on/off and tempo; the percussion channel is skipped.
+    """
+    with open(path, "rb") as f: data = f.read()
+    if data[:4] != b"MThd": raise ValueError(f"{path}: not a MIDI file")
+    hlen, _, ntracks, division = struct.unpack(">IHHH", data[4:14])
+    if division & 0x8000: raise ValueError(f"{path}: SMPTE time division is not supported")
+    events, pos = [], 8 + hlen       # (tick, order at the same tick, kind, channel << 7 | key, velocity)
+    for _ in range(ntracks):
+        if data[pos:pos+4] != b"MTrk": raise ValueError(f"{path}: broken track header")
+        (length,) = struct.unpack(">I", data[pos+4:pos+8]); pos += 8; end = pos + length
+        tick = status = 0
+        while pos < end:
+            delta, pos = varlen(data, pos); tick += delta
+            if data[pos] & 0x80: status = data[pos]; pos += 1 # else running status
+            if status == 0xFF:
+                kind = data[pos]; n, pos = varlen(data, pos + 1)
+                if kind == 0x51: events.append((tick, 0, "tempo", int.from_bytes(data[pos:pos+3], "big"), 0))
+                pos += n
+            elif status in (0xF0, 0xF7): n, pos = varlen(data, pos); pos += n
+            elif status & 0xF0 in (0xC0, 0xD0): pos += 1
+            else:
+                kind, channel = status & 0xF0, status & 0x0F; k, v = data[pos], data[pos+1]; pos += 2
+                if channel == 9: continue
+                if kind == 0x90 and v: events.append((tick, 2, "on", channel << 7 | k, v))
+                elif kind in (0x80, 0x90): events.append((tick, 1, "off", channel << 7 | k, 0))
+        pos = end
+    events.sort()
+    sec, last, tempo, held, notes = 0.0, 0, 500000, {}, []
+    for tick, _, kind, a, b in events:
+        sec += (tick - last) * tempo / 1e6 / division; last = tick
+        if kind == "tempo": tempo = a
+        elif kind == "on": held.setdefault(a, []).append((sec, b))
+        elif held.get(a): start, vel = held[a].pop(0); notes.append((start, sec, a & 0x7F, vel))
+    notes.sort()
+    return notes
+
+class MidiSynth:
+    """Renders MIDI notes to PCM from one wavetable, any slice of the track on request.
+
+    Each note's phase counts from its own note-on, so chunks join without clicks. Fades are part of
+    the rendered samples (mixer fades would not carry over into the next queued chunk).
+    """
+    def __init__(self, notes, freq, channels, settings=None):
+        self.settings = s = settings or config.BGM_MIDI
+        self.notes = notes; self.freq = freq; self.channels = channels
+        self.table = wavetable(s["brightness"]); self.release = s["release_ms"] / 1000
+        self.starts = np.array([n[0] for n in notes])
+        self.longest = max((e - st for st, e, _, _ in notes), default=0.0) + self.release
+        self.length = int((max((e for _, e, _, _ in notes), default=0.0) + self.release) * freq) # frames
+        self.fade_in = self.fade_out = None # (first frame, frames)
+
+    def gain(self, frames):
+        g = np.ones(len(frames), np.float32)
+        if self.fade_in: first, n = self.fade_in; g *= np.clip((frames - first) / n, 0, 1)
+        if self.fade_out: first, n = self.fade_out; g *= np.clip(1 - (frames - first) / n, 0, 1)
+        return g
+
+    def render(self, pos, n):
+        f, size = self.freq, len(self.table); out = np.zeros(n, np.float32)
+        lo = np.searchsorted(self.starts, pos / f - self.longest); hi = np.searchsorted(self.starts, (pos + n) / f)
+        for start, end, key, vel in self.notes[lo:hi]: # only notes still sounding in this slice
+            on = int(start * f); a, b = max(pos, on), min(pos + n, int((end + self.release) * f))
+            if a >= b: continue
+            since = np.arange(a - on, b - on); t = since / f
+            step = 440.0 * 2 ** ((key - 69) / 12) * size / f
+            env = np.minimum(1.0, t / 0.005) * np.exp(-t * self.settings["decay"]) # struck: fades while held
+            env *= np.clip(1 - (t - (end - start)) / self.release, 0, 1)        # then released
+            out[a-pos:b-pos] += self.table[(since * step % size).astype(np.intp)] * env * (vel / 127)
+        out *= self.gain(np.arange(pos, pos + n)) * self.settings["volume"]
+        pcm = (np.clip(out, -1, 1) * 32767).astype(np.int16)
+        return np.repeat(pcm[:, None], self.channels, axis=1) if self.channels > 1 else pcm
+
+class MidiStream:
+    """Plays a MIDI file on one mixer channel without ever holding the decoded track.
+
+    A worker thread renders `chunk_ms` of PCM and queues it behind the chunk that is playing,
+    so only two chunks exist at a time. fade_out() shapes the chunks still to be rendered.
+    """
+    def __init__(self, path, channel, fade_ms=0):
+        freq, _, channels = pygame.mixer.get_init()
+        self.synth = MidiSynth(read_midi(path), freq, channels)
+        self.channel = channel; self.freq = freq; self.pos = 0
+        self.chunk = int(freq * config.BGM_MIDI["chunk_ms"] / 1000)
+        if fade_ms: self.synth.fade_in = (0, int(freq * fade_ms / 1000))
+        self.stopped = False; self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True); self.thread.start()
+
+    def duration(self): return self.synth.length / self.freq
+
+    def run(self):
+        first = True
+        while not self.stopped and self.pos < self.synth.length:
+            if not first and self.channel.get_queue() is not None: time.sleep(self.chunk / self.freq / 4); continue
+            n = min(self.chunk, self.synth.length - self.pos)
+            sound = pygame.sndarray.make_sound(self.synth.render(self.pos, n)); self.pos += n
+            with self.lock:
+                if self.stopped: return
+                if first or not self.channel.get_busy(): self.channel.play(sound); first = False # start, or recover from an underrun
+                else: self.channel.queue(sound)
+            if self.synth.fade_out and self.pos >= sum(self.synth.fade_out): return # faded to silence
+
+    def fade_out(self, ms):
+        self.synth.fade_out = (self.pos, max(1, int(self.freq * ms / 1000)))
+
+    def stop(self):
+        with self.lock: self.stopped = True; self.channel.stop() # stop() also drops the queued chunk
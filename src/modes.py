@@ -0,0 +1,52 @@
+import os
+import re
+try:
+    import config
+    from loader import read_text
+except ImportError:
+    from src import config
+    from src.loader import read_text
+
+COMMENT = re.compile(r"/\*.*?\*/", re.S)
+RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+# Scope of a rule, by what its selector names; the window sets each scope's sheet on that scope's widgets only.
+# Anything else (QWidget, QListView, action buttons...) is for the workspace. Dialogs get every rule.
+SCOPES = {"topbar": ('class="topbar"',), "keyboard": ('class="tab"', 'class="special"', 'class="colorkey"')}
+
+def parse(text):
+    """QSS -> [(selector, {property: value})], without comments or extra whitespace."""
+    rules = []
+    for sel, body in RULE.findall(COMMENT.sub("", text)):
+        decls = [d.split(":", 1) for d in body.split(";") if ":" in d]
+        rules.append((" ".join(sel.split()), {k.strip(): " ".join(v.split()) for k, v in decls}))
+    return rules
+
+def emit(rules): return "\n".join(f"{sel} {{ {'; '.join(f'{k}: {v}' for k, v in decls.items())} }}" for sel, decls in rules if decls)
+
+def scope_of(selector): return next((s for s, marks in SCOPES.items() if any(m in selector for m in marks)), "workspace")
+
+class ModeSheets:
+    """Every QSS mode, parsed once and cut into the sheets a switch needs.
+
+    Declarations that are the same in all modes make up `base`, set once on the application for the
+    widgets outside any scope. Each scope's rules go on that scope's widgets, so a switch re-polishes
+    only scopes whose sheet changed, and never the keyboard keys (their look is ColorKey.STYLE).
+    """
+    def __init__(self, modes=None, modes_dir=None):
+        modes_dir = modes_dir or config.MODES_DIR
+        parsed = {m: parse(read_text(os.path.join(modes_dir, f"{m}.qss"))) for m in modes or config.THEME_ORDER
+                  if os.path.exists(os.path.join(modes_dir, f"{m}.qss"))}
+        first = next(iter(parsed.values()), [])
+        shared = {sel: {k: v for k, v in decls.items() if all(dict(r).get(sel, {}).get(k) == v for r in parsed.values())}
+                  for sel, decls in first}
+        self.base = emit(shared.items())
+        self.sheets, self.backgrounds = {}, {}
+        for m, rules in parsed.items():
+            scoped = {"dialog": rules} # whole rules: a scope's sheet outranks the app's, so split declarations could lose to a less specific selector
+            for sel, decls in rules: scoped.setdefault(scope_of(sel), []).append((sel, decls))
+            self.sheets[m] = {scope: emit(r) for scope, r in scoped.items()}
+            self.backgrounds[m] = next((d["background-color"] for sel, d in rules if "QMainWindow" in sel and "background-color" in d), None)
+
+    def sheet(self, mode, scope): return self.sheets.get(mode, {}).get(scope, "")
+
+    def background(self, mode): return self.backgrounds.get(mode)
@@ -0,0 +1,98 @@
+import os
+import re
+import threading
+import numpy as np
+from PyQt5.QtGui import QImage
+try:
+    import config
+except ImportError:
+    from src import config
+
+# Procedural papers: theme names like "fractal#42" are drawn from (generator, seed) instead of read from a file.
+# Every generator works in paper coordinates (u, v in 0..1, x = u * aspect), so a thumbnail, the paper and
+# the 2x export are the same picture at different resolutions, and a seed always gives the same paper.
+VERSION = 1                   # bump when a generator's output changes: cached files are named with it
+NAME = re.compile(r"^(fractal|gradient|pattern)#(\d+)$")
+
+def smoothstep(a, b, x):
+    t = np.clip((x - a) / (b - a), 0, 1)
+    return t * t * (3 - 2 * t)
+
+def palette(rng):
+    # Cosine palette (a + b cos(2pi(f t + phase))), pulled towards white so papers stay soft
+    phase, f = rng.uniform(0, 1, 3), rng.uniform(0.6, 1.4)
+    return lambda t: 0.35 + 0.65 * (0.5 + 0.5 * np.cos(2 * np.pi * (f * t[..., None] + phase)))
+
+def fractal(rng, x, y, px):
+    # Julia set, smooth escape-time coloring; iterates only the points that have not escaped yet
+    c = 0.7885 * np.exp(1j * rng.uniform(0, 2 * np.pi)); zoom = rng.uniform(1.4, 2.2); color = palette(rng)
+    z = ((x - x.max() / 2) + 1j * (y - 0.5)) * zoom
+    z, n = z.ravel(), np.full(z.size, 1.0); alive = np.arange(z.size)
+    for i in range(48):
+        zs = z[alive] = z[alive] ** 2 + c
+        out = np.abs(zs) > 4
+        n[alive[out]] = (i + 1 - np.log2(np.log(np.abs(zs[out])))) / 48; alive = alive[~out]
+        if not alive.size: break
+    return color(np.clip(n, 0, 1).reshape(x.shape))
+
+def gradient(rng, x, y, px):
+    # Stops along a random direction, plus a soft glow somewhere on the paper
+    color = palette(rng); a = rng.uniform(0, 2 * np.pi)
+    t = x * np.cos(a) + y * np.sin(a); t = (t - t.min()) / max(np.ptp(t), 1e-9)
+    lo, hi = np.sort(rng.uniform(0, 1, 2)); rgb = color(lo + (hi - lo) * t)
+    gx, gy = rng.uniform(0, x.max()), rng.uniform(0, 1)
+    glow = np.exp(-((x - gx) ** 2 + (y - gy) ** 2) / rng.uniform(0.05, 0.2))
+    return rgb + (1 - rgb) * glow[..., None] * 0.6
+
+def pattern(rng, x, y, px):
+    # Dots, stripes, checks or waves; `px` (one pixel in paper units) keeps the edges antialiased at any size
+    color = palette(rng); bg, fg = color(np.array(rng.uniform(0, 1))), color(np.array(rng.uniform(0, 1)))
+    p = rng.uniform(0.06, 0.14); kind = rng.integers(4); e = px / p
+    if kind == 0:
+        r = np.hypot(x / p % 1 - 0.5, y / p % 1 - 0.5); shape = smoothstep(e, -e, r - rng.uniform(0.15, 0.35))
+    elif kind == 1:
+        a = rng.uniform(0, np.pi); s = (x * np.cos(a) + y * np.sin(a)) / p % 1
+        shape = smoothstep(e, -e, np.abs(s - 0.5) - rng.uniform(0.1, 0.3))
+    elif kind == 2:
+        shape = (np.floor(x / p) + np.floor(y / p)) % 2
+    else:
+        s = (y / p + rng.uniform(0.1, 0.4) * np.sin(2 * np.pi * x / (3 * p))) % 1; shape = smoothstep(e, -e, np.abs(s - 0.5) - 0.15)
+    return bg + (fg - bg) * shape[..., None]
+
+GENERATORS = {"fractal": fractal, "gradient": gradient, "pattern": pattern}
+
+def parse(name):
+    m = NAME.match(name)
+    return (m[1], int(m[2])) if m else None
+
+def names(count):
+    return [f"{g}#{seed}" for seed in range(count) for g in GENERATORS] # interleaved: the gallery top shows every kind
+
+def render(generator, seed, w, h):
+    """RGB uint8 array (h, w, 3): the decoration around the edges, plain paper in the writing area."""
+    rng = np.random.default_rng([seed, list(GENERATORS).index(generator)])
+    aspect = config.PAPER_W / config.PAPER_H; px = 1 / h
+    y, x = np.mgrid[0:h, 0:w].astype(np.float32); x, y = (x + 0.5) / w * aspect, (y + 0.5) / h
+    decor = GENERATORS[generator](rng, x, y, px)
+    paper = 0.94 + 0.06 * palette(rng)(np.array(0.0))  # near-white, tinted to match
+    u, v = 2 * x / aspect - 1, 2 * y - 1
+    edge = smoothstep(0.78, 0.95, (np.abs(u) ** 8 + np.abs(v) ** 8) ** (1 / 8))[..., None] # a rounded rectangle
+    rgb = paper + (decor - paper) * (0.12 + 0.88 * edge)  # a faint trace stays, so the area still looks part of the paper
+    return (np.clip(rgb, 0, 1) * 255 + 0.5).astype(np.uint8)
+
+def cache_path(generator, seed, w, h, cache_dir=None):
+    return os.path.join(cache_dir or config.THEME_CACHE_DIR, f"{generator}_{seed}_v{VERSION}_{w}x{h}.png")
+
+def paper_image(name, w, h, keep_aspect=False, cache_dir=None):
+    """QImage of a procedural paper, cached on disk by (generator, seed, size). Safe on loader threads."""
+    generator, seed = parse(name)
+    if keep_aspect: s = min(w / config.PAPER_W, h / config.PAPER_H); w, h = round(config.PAPER_W * s), round(config.PAPER_H * s)
+    path = cache_path(generator, seed, w, h, cache_dir)
+    img = QImage(path)
+    if not img.isNull(): return img
+    rgb = np.ascontiguousarray(render(generator, seed, w, h))
+    img = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888).copy() # copy: the array is freed on return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    if img.save(tmp, "PNG"): os.replace(tmp, path)
+    return img
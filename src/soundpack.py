@@ -0,0 +1,78 @@
+import io
+import os
+import sys
+import mmap
+import glob
+import struct
+try:
+    import config
+except ImportError:
+    from src import config
+
+# Layout: header | index | payloads
+#   header  "SKPK", version u16, entry count u32
+#   index   per entry: name length u16, UTF-8 name, payload offset u64, payload length u32
+#   payload the sound files' bytes as they are (WAV or OGG), so pygame decodes them unchanged
+MAGIC, VERSION = b"SKPK", 1
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<QI")
+
+class Payload(io.RawIOBase):
+    """File-like reader over one payload slice: the decoder reads straight out of the mapping, nothing is copied up front."""
+    def __init__(self, view): self.view = view; self.pos = 0
+    def readable(self): return True
+    def seekable(self): return True
+    def tell(self): return self.pos
+    def seek(self, offset, whence=io.SEEK_SET):
+        self.pos = max(0, (0, self.pos, len(self.view))[whence] + offset); return self.pos
+    def readinto(self, b):
+        n = max(0, min(len(b), len(self.view) - self.pos)); b[:n] = self.view[self.pos:self.pos + n]; self.pos += n
+        return n
+    def close(self):
+        if not self.closed: self.view.release() # lets the pack unmap
+        super().close()
+
+class SoundPack:
+    """Read-only view of a packed sound bank: one open + mmap, then slices by file name."""
+    def __init__(self, path):
+        with open(path, "rb") as f: self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        magic, version, count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION: raise ValueError(f"{path}: not a v{VERSION} sound pack")
+        self.index = {}; pos = HEADER.size
+        for _ in range(count):
+            (n,) = struct.unpack_from("<H", self.mm, pos); pos += 2
+            name = bytes(self.view[pos:pos + n]).decode("utf-8"); pos += n
+            self.index[name] = ENTRY.unpack_from(self.mm, pos); pos += ENTRY.size
+            if sum(self.index[name]) > len(self.mm): raise ValueError(f"{path}: truncated sound pack")
+
+    def __contains__(self, name): return name in self.index
+
+    def data(self, name):
+        offset, length = self.index[name]
+        return self.view[offset:offset + length]
+
+    def open(self, name): return Payload(self.data(name))
+
+    def close(self):
+        self.view.release(); self.mm.close()
+
+def build(sounds_dir=None, out=None):
+    sounds_dir = sounds_dir or config.SOUNDS_DIR; out = out or config.SOUND_PACK
+    files = sorted(glob.glob(os.path.join(sounds_dir, "*.wav")) + glob.glob(os.path.join(sounds_dir, "*.ogg")))
+    names = [os.path.basename(f).encode("utf-8") for f in files]
+    offset = HEADER.size + sum(2 + len(n) + ENTRY.size for n in names)
+    payloads, index = [], []
+    for f, n in zip(files, names):
+        with open(f, "rb") as fh: data = fh.read()
+        index.append(struct.pack("<H", len(n)) + n + ENTRY.pack(offset, len(data)))
+        payloads.append(data); offset += len(data)
+    with open(out + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(files))); f.writelines(index); f.writelines(payloads)
+    os.replace(out + ".tmp", out) # an interrupted build leaves the old pack, never half of a new one
+    return len(files), offset
+
+if __name__ == "__main__":
+    # python -m src.soundpack [sounds_dir] [out.pack]
+    count, size = build(*sys.argv[1:3])
+    print(f"Packed {count} sounds ({size / 2**20:.1f} MB) into {sys.argv[2] if len(sys.argv) > 2 else config.SOUND_PACK}")
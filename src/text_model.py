@@ -0,0 +1,156 @@
+from array import array
+
+class LetterText:
+    """Letter buffer: a gap buffer of code points plus run-length encoded colors.
+
+    Edits at the cursor only move the gap by the distance the cursor travelled, so typing,
+    backspace and paste are amortized O(1) per character. Colors are stored as runs of
+    palette indices (run_lens/run_ids); lookups start from the last run touched, so edits
+    near the cursor stay cheap.
+    `positions` maps each code point to its physical slots in the gap buffer, updated only
+    for the characters the gap moves over, so recolor_char() finds every occurrence directly.
+    Listeners are called as fn(kind, index, count) with kind "insert", "remove" or "recolor".
+    """
+    def __init__(self, capacity=64):
+        self.chars = array('I', [0]) * capacity
+        self.gap_start, self.gap_end = 0, capacity
+        self.positions = {}           # code point -> set of physical indices in `chars`
+        self.run_lens = array('I'); self.run_ids = array('H')
+        self.hint = (0, 0)            # (run index, first character of that run) of the last lookup
+        self.palette = []             # palette index -> hex color
+        self.palette_ids = {}         # hex color -> palette index
+        self.listeners = []
+
+    def __len__(self): return len(self.chars) - (self.gap_end - self.gap_start)
+
+    def __iter__(self):
+        for start, end, color in self.runs():
+            for i in range(start, end): yield self.char_at(i), color
+
+    def subscribe(self, fn): self.listeners.append(fn)
+
+    def _notify(self, kind, index, count):
+        for fn in self.listeners: fn(kind, index, count)
+
+    def _color_id(self, hex_color):
+        if hex_color not in self.palette_ids:
+            self.palette_ids[hex_color] = len(self.palette); self.palette.append(hex_color)
+        return self.palette_ids[hex_color]
+
+    # --- Characters (gap buffer) ---
+    def _phys(self, index): return index if index < self.gap_start else index + self.gap_end - self.gap_start
+
+    def _shift(self, lo, hi, delta):
+        # Characters in physical slots [lo, hi) are about to move by `delta`; walk so no target is still occupied.
+        for p in (range(hi - 1, lo - 1, -1) if delta > 0 else range(lo, hi)):
+            slots = self.positions[self.chars[p]]; slots.discard(p); slots.add(p + delta)
+
+    def _move_gap(self, index):
+        gs, ge = self.gap_start, self.gap_end
+        if index < gs:
+            n = gs - index
+            self._shift(index, gs, ge - gs)
+            self.chars[ge-n:ge] = self.chars[index:gs]
+            self.gap_start, self.gap_end = index, ge - n
+        elif index > gs:
+            n = index - gs
+            self._shift(ge, ge + n, gs - ge)
+            self.chars[gs:gs+n] = self.chars[ge:ge+n]
+            self.gap_start, self.gap_end = index, ge + n
+
+    def _grow(self, need):
+        size = len(self); cap = max(2 * len(self.chars), size + need)
+        gs, ge, extra = self.gap_start, self.gap_end, cap - len(self.chars)
+        for slots in self.positions.values():
+            moved = {p for p in slots if p >= ge}
+            if moved: slots -= moved; slots |= {p + extra for p in moved}
+        self.chars = self.chars[:gs] + array('I', [0]) * (ge - gs + extra) + self.chars[ge:]
+        self.gap_end = ge + extra
+
+    def char_at(self, index): return chr(self.chars[self._phys(index)])
+    def text(self): return ''.join(map(chr, self.chars[:self.gap_start] + self.chars[self.gap_end:]))
+
+    # --- Colors (runs) ---
+    def _find_run(self, index):
+        # Run containing `index`, or (len(runs), len(self)) for the end of the letter.
+        r, start = self.hint
+        while r > 0 and start > index: r -= 1; start -= self.run_lens[r]
+        while r < len(self.run_lens) and start + self.run_lens[r] <= index: start += self.run_lens[r]; r += 1
+        self.hint = (r, start)
+        return r, start
+
+    def _splice(self, lo, hi, lo_start, pieces):
+        # Replace runs [lo, hi) with (length, id) pieces, merging with equal neighbours.
+        if lo > 0: lo -= 1; lo_start -= self.run_lens[lo]; pieces.insert(0, (self.run_lens[lo], self.run_ids[lo]))
+        if hi < len(self.run_lens): pieces.append((self.run_lens[hi], self.run_ids[hi])); hi += 1
+        lens, ids = array('I'), array('H')
+        for n, cid in pieces:
+            if not n: continue
+            if ids and ids[-1] == cid: lens[-1] += n
+            else: lens.append(n); ids.append(cid)
+        self.run_lens[lo:hi] = lens; self.run_ids[lo:hi] = ids
+        self.hint = (lo, lo_start)
+
+    def runs(self, lo=0, hi=None):
+        # (start, end, color) of the runs covering characters [lo, hi), clipped to that range.
+        hi = len(self) if hi is None else hi
+        r, start = self._find_run(lo)
+        while r < len(self.run_lens) and start < hi:
+            n = self.run_lens[r]
+            yield max(start, lo), min(start + n, hi), self.palette[self.run_ids[r]]; start += n; r += 1
+
+    def recolor_char(self, char, hex_color):
+        # Recolor every occurrence of `char` in one pass over the runs, then notify once.
+        slots = self.positions.get(ord(char))
+        if not slots: return
+        gs, gap = self.gap_start, self.gap_end - self.gap_start
+        targets = sorted(p if p < gs else p - gap for p in slots)
+        cid = self._color_id(hex_color)
+        pieces, t, start = [], 0, 0
+        for n, rid in zip(self.run_lens, self.run_ids):
+            end, pos = start + n, start
+            while t < len(targets) and targets[t] < end:
+                i = targets[t]
+                if i > pos: pieces.append((i - pos, rid))
+                pieces.append((1, cid)); pos = i + 1; t += 1
+            if end > pos: pieces.append((end - pos, rid))
+            start = end
+        self.hint = (0, 0); self._splice(0, len(self.run_lens), 0, pieces)
+        self._notify("recolor", targets[0], len(targets))
+
+    # --- Edits ---
+    def insert(self, index, text, colors):
+        # `colors` is one hex color for the whole text, or one per character (paste).
+        n = len(text)
+        if not n: return
+        if isinstance(colors, str): pieces = [(n, self._color_id(colors))]
+        else:
+            pieces = []
+            for cid in map(self._color_id, colors):
+                if pieces and pieces[-1][1] == cid: pieces[-1] = (pieces[-1][0] + 1, cid)
+                else: pieces.append((1, cid))
+        r, start = self._find_run(index)
+        if r < len(self.run_lens):
+            rn, rid = self.run_lens[r], self.run_ids[r]
+            self._splice(r, r+1, start, [(index - start, rid)] + pieces + [(start + rn - index, rid)])
+        else: self._splice(r, r, start, pieces)
+        if self.gap_end - self.gap_start < n: self._grow(n)
+        self._move_gap(index)
+        gs = self.gap_start
+        self.chars[gs:gs+n] = array('I', map(ord, text))
+        for p, c in enumerate(self.chars[gs:gs+n], gs): self.positions.setdefault(c, set()).add(p)
+        self.gap_start += n
+        self._notify("insert", index, n)
+
+    def remove(self, index, count=1):
+        count = min(count, len(self) - index)
+        if count <= 0: return
+        end = index + count
+        r, start = self._find_run(index)
+        r2, start2 = r, start
+        while start2 + self.run_lens[r2] < end: start2 += self.run_lens[r2]; r2 += 1
+        self._splice(r, r2+1, start, [(index - start, self.run_ids[r]), (start2 + self.run_lens[r2] - end, self.run_ids[r2])])
+        self._move_gap(index)
+        for p in range(self.gap_end, self.gap_end + count): self.positions[self.chars[p]].discard(p)
+        self.gap_end += count
+        self._notify("remove", index, count)
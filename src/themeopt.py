@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import Image
+try:
+    import config
+    from themes import cache_path
+except ImportError:
+    from src import config
+    from src.themes import cache_path
+
+# Turns big AI-generated papers into light themes: notebook/pillow_etc.ipynb's make_it_light for a whole folder.
+# Each output is a quantized PNG in THEME_DIR plus its gallery thumbnail, pre-scaled into THEME_CACHE_DIR
+# under the name ThemeCache looks for, so a new theme is never decoded at full size by the app.
+MANIFEST = ".themeopt.json"   # in the output folder: output name -> hash of the source and settings
+INPUTS = (".png", ".jpg", ".jpeg", ".webp")
+
+def file_sha1(path):
+    with open(path, "rb") as f: return hashlib.file_digest(f, "sha1").hexdigest()
+
+def fit_and_crop(img, w, h):
+    # Scale to cover w x h (by width, or by height for very wide images), then crop the center
+    scale = max(w / img.width, h / img.height)
+    img = img.resize((max(w, round(img.width * scale)), max(h, round(img.height * scale))), Image.Resampling.LANCZOS)
+    left, top = (img.width - w) // 2, (img.height - h) // 2
+    return img.crop((left, top, left + w, top + h))
+
+def make_it_light(src, dst, w, h, colors=256):
+    with Image.open(src) as img:
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        out = fit_and_crop(img, w, h)
+    if colors: out = out.quantize(colors=colors, method=Image.Quantize.FASTOCTREE) # ~3x smaller, fine for illustrations
+    tmp = dst + ".tmp"
+    out.save(tmp, "PNG", optimize=True); os.replace(tmp, dst)
+    return out
+
+def thumbnail(img, path, w, h):
+    thumb = img.convert("RGBA"); thumb.thumbnail((w, h), Image.Resampling.LANCZOS) # keeps aspect, like the gallery's
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"; thumb.save(tmp, "PNG"); os.replace(tmp, path)
+
+def job(src, dst, settings):
+    # Runs in a worker process
+    t = time.perf_counter()
+    out = make_it_light(src, dst, settings["w"], settings["h"], settings["colors"])
+    tw, th = settings["thumb"]
+    thumbnail(out, cache_path(file_sha1(dst), tw, th, True, settings["cache_dir"]), tw, th)
+    return os.path.getsize(src), os.path.getsize(dst), time.perf_counter() - t
+
+def optimize(in_dir, out_dir=None, w=None, h=None, colors=256, workers=None, force=False, cache_dir=None, log=print):
+    out_dir = out_dir or config.THEME_DIR; w = w or int(config.PAPER_W); h = h or int(config.PAPER_H)
+    settings = {"w": w, "h": h, "colors": colors, "thumb": list(config.THEME_THUMB), "cache_dir": cache_dir or config.THEME_CACHE_DIR}
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f: manifest = json.load(f)
+    except (OSError, ValueError): manifest = {}
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = json.dumps({k: v for k, v in settings.items() if k != "cache_dir"}, sort_keys=True)
+    todo, skipped = {}, 0
+    for f in sorted(os.listdir(in_dir)):
+        if not f.lower().endswith(INPUTS): continue
+        src = os.path.join(in_dir, f); name = os.path.splitext(f)[0] + ".png"; dst = os.path.join(out_dir, name)
+        key = hashlib.sha1((file_sha1(src) + stamp).encode("utf-8")).hexdigest()
+        if not force and manifest.get(name) == key and os.path.exists(dst): skipped += 1; continue
+        if os.path.abspath(src) == os.path.abspath(dst): log(f"{f}: skipped, would overwrite its own source"); continue
+        todo[name] = (src, dst, key)
+    saved = total_in = 0; failed = []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(job, src, dst, settings): name for name, (src, dst, key) in todo.items()}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try: size_in, size_out, secs = fut.result()
+            except Exception as e: # a broken image must not stop the batch
+                failed.append(name); log(f"{name}: FAILED {e}"); continue
+            saved += size_in - size_out; total_in += size_in; manifest[name] = todo[name][2]
+            log(f"{name}: {size_in / 1024:8.1f} KB -> {size_out / 1024:6.1f} KB  ({100 * (1 - size_out / size_in):4.1f}% saved)  {secs * 1000:6.0f} ms")
+            with open(manifest_path, "w", encoding="utf-8") as f: json.dump(manifest, f, indent=1, sort_keys=True)
+    return len(todo) - len(failed), skipped, failed, saved, total_in
+
+if __name__ == "__main__":
+    # python -m src.themeopt <folder of big papers> [--out assets/themes] [--colors 256] [--workers N] [--force]
+    p = argparse.ArgumentParser(description="Crop, quantize and thumbnail paper themes in parallel.")
+    p.add_argument("input")
+    p.add_argument("--out", default=config.THEME_DIR)
+    p.add_argument("--size", default=f"{int(config.PAPER_W)}x{int(config.PAPER_H)}", help="WxH of the paper")
+    p.add_argument("--colors", type=int, default=256, help="palette size; 0 keeps full color")
+    p.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    p.add_argument("--force", action="store_true", help="ignore the content-hash manifest")
+    a = p.parse_args()
+    w, h = map(int, a.size.lower().split("x"))
+    t = time.perf_counter()
+    built, skipped, failed, saved, total_in = optimize(a.input, a.out, w, h, a.colors, a.workers, a.force)
+    pct = f" ({100 * saved / total_in:.1f}%)" if total_in else ""
+    print(f"Optimized {built}, unchanged {skipped}, failed {len(failed)}: saved {saved / 2**20:.1f} MB{pct} in {time.perf_counter() - t:.1f} s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,149 @@
+import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QSize, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QImage, QPixmap
+try:
+    import config
+    import papers
+    from loader import PRIORITY_SOON
+except ImportError:
+    from src import config
+    from src import papers
+    from src.loader import PRIORITY_SOON
+
+stamps = {}                       # source path -> (size, mtime, sha1), so unchanged files are hashed once
+
+def source_hash(path):
+    st = os.stat(path); known = stamps.get(path)
+    if known and known[:2] == (st.st_size, st.st_mtime_ns): return known[2]
+    with open(path, "rb") as f: sha1 = hashlib.file_digest(f, "sha1").hexdigest()
+    stamps[path] = (st.st_size, st.st_mtime_ns, sha1)
+    return sha1
+
+def cache_path(sha1, w, h, keep_aspect=False, cache_dir=None): # "_fit": scaled to fit inside w x h, aspect kept
+    return os.path.join(cache_dir or config.THEME_CACHE_DIR, f"{sha1}_{w}x{h}{'_fit' if keep_aspect else ''}.png")
+
+def scaled_image(path, w, h, keep_aspect=False, cache_dir=None):
+    """`path` scaled to w x h as a QImage, read from the on-disk cache when this exact source was scaled before.
+
+    Cache files are named by source hash, size and fit, so an edited theme gets new ones. Only QImage
+    is used, so loader threads can call this.
+    """
+    try: cached = cache_path(source_hash(path), w, h, keep_aspect, cache_dir)
+    except OSError: return None
+    img = QImage(cached)
+    if not img.isNull(): return img
+    img = QImage(path)
+    if img.isNull(): return None
+    if (img.width(), img.height()) == (w, h): return img # already the right size: the source is its own cache
+    img = img.scaled(w, h, Qt.KeepAspectRatio if keep_aspect else Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    tmp = f"{cached}.{threading.get_ident()}.tmp" # two workers may race on the same file; the rename is atomic
+    if img.save(tmp, "PNG"): os.replace(tmp, cached)
+    return img
+
+def prune_disk_cache(cache_dir=None, budget=None, tmp_age=3600):
+    """Delete the least recently read cache files until THEME_CACHE_DIR fits in `budget` bytes.
+
+    Run once at startup on a loader thread: a deleted file is just scaled or drawn again when next
+    asked for. Leftover .tmp files of interrupted writes go too, once they are old enough to be dead.
+    Returns (files removed, bytes freed).
+    """
+    cache_dir = cache_dir or config.THEME_CACHE_DIR
+    budget = config.THEME_CACHE["disk_mb"] << 20 if budget is None else budget
+    try: entries = [(f.path, f.stat()) for f in os.scandir(cache_dir) if f.is_file()]
+    except OSError: return 0, 0
+    now, files, doomed = time.time(), [], []
+    for path, st in entries:
+        if path.endswith(".png"): files.append((st.st_atime, st.st_size, path))
+        elif path.endswith(".tmp") and now - st.st_mtime > tmp_age: doomed.append((st.st_size, path))
+    used = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files): # oldest read first
+        if used <= budget: break
+        doomed.append((size, path)); used -= size
+    removed = freed = 0
+    for size, path in doomed:
+        try: os.remove(path); removed += 1; freed += size
+        except OSError: pass
+    return removed, freed
+
+class ThemeCache:
+    """Theme pixmaps (paper backgrounds and thumbnails) kept in memory up to `budget` bytes, least recently used out first.
+
+    Themes are the PNG files plus procedural papers ("fractal#42"), which are drawn instead of read.
+    get() is for the GUI thread; images made on loader threads with image() come in through put().
+    """
+    def __init__(self, theme_dir=None, budget=None):
+        self.theme_dir = theme_dir or config.THEME_DIR
+        self.budget = budget or config.THEME_CACHE["budget_mb"] << 20
+        self.pixmaps = OrderedDict()  # (name, w, h) -> QPixmap
+        self.used = 0
+
+    def path(self, name): return os.path.join(self.theme_dir, f"{name}.png")
+
+    def files(self):
+        return sorted(os.path.splitext(f)[0] for f in os.listdir(self.theme_dir) if f.lower().endswith(".png"))
+
+    def names(self): return self.files() + papers.names(config.PROCEDURAL_PAPERS["count"])
+
+    def image(self, name, w, h, keep_aspect=False):
+        if papers.parse(name): return papers.paper_image(name, w, h, keep_aspect)
+        return scaled_image(self.path(name), w, h, keep_aspect)
+
+    def peek(self, name, w, h):
+        key = (name, w, h)
+        if key in self.pixmaps: self.pixmaps.move_to_end(key); return self.pixmaps[key]
+        return None
+
+    def get(self, name, w, h, keep_aspect=False):
+        pm = self.peek(name, w, h)
+        if pm is not None: return pm
+        img = self.image(name, w, h, keep_aspect)
+        return self.put(name, w, h, img) if img is not None else None
+
+    def put(self, name, w, h, image):
+        key, pm = (name, w, h), QPixmap.fromImage(image)
+        if key in self.pixmaps: self.used -= cost(self.pixmaps.pop(key))
+        self.pixmaps[key] = pm; self.used += cost(pm)
+        while self.used > self.budget and len(self.pixmaps) > 1: self.used -= cost(self.pixmaps.popitem(last=False)[1])
+        return pm
+
+    def paper(self, name): return self.get(name, int(config.PAPER_W), int(config.PAPER_H))
+
+class ThemeListModel(QAbstractListModel):
+    """Theme gallery rows. Thumbnails are made only for rows the view paints.
+
+    A row without a cached thumbnail queues it on the loader (usually a small read from the disk
+    cache) and is repainted when it arrives. Evicted thumbnails are simply asked for again.
+    """
+    def __init__(self, cache, loader, parent=None):
+        super().__init__(parent)
+        self.cache = cache; self.loader = loader; self.loader.loaded.connect(self.on_loaded)
+        self.rows = cache.names(); self.row_of = {n: i for i, n in enumerate(self.rows)}
+        self.pending = set(); self.broken = set()
+
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        name = self.rows[index.row()]
+        if role == Qt.UserRole: return name
+        if role == Qt.SizeHintRole: return QSize(*config.THEME_THUMB)
+        if role != Qt.DecorationRole: return None
+        pm = self.cache.peek(name, *config.THEME_THUMB)
+        if pm is None and name not in self.pending and name not in self.broken:
+            self.pending.add(name)
+            self.loader.submit(PRIORITY_SOON, f"theme:{name}", self.cache.image, name, *config.THEME_THUMB, True)
+        return pm
+
+    def on_loaded(self, key, result):
+        kind, name = key.split(":", 1)
+        if kind != "theme" or name not in self.pending: return
+        self.pending.discard(name)
+        if result is None: self.broken.add(name); return
+        self.cache.put(name, *config.THEME_THUMB, result)
+        ix = self.index(self.row_of[name]); self.dataChanged.emit(ix, ix, [Qt.DecorationRole])
+
+def cost(pixmap): return pixmap.width() * pixmap.height() * pixmap.depth() // 8
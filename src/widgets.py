@@ -1,5 +1,5 @@
 import sys
-from PyQt5.QtWidgets import QWidget, QLabel, QPushButton, QGraphicsTextItem, QGridLayout
+from PyQt5.QtWidgets import QWidget, QLabel, QPushButton, QGraphicsTextItem, QGridLayout, QStylePainter, QStyleOptionButton, QStyle
 from PyQt5.QtCore import Qt, QMimeData
 from PyQt5.QtGui import QDrag, QPixmap, QColor
 try:
@@ -64,21 +64,26 @@ class DraggableSticker(QLabel):
             drag.exec_(Qt.CopyAction | Qt.MoveAction)
 
 class ColorKey(QPushButton):
+    # Set once on the keyboard container: keys share one parsed sheet and paint their own text color
+    STYLE = """
+        ColorKey {
+            background-color: white; border: 1px solid #bbb; border-radius: 8px;
+            font-size: 20px; font-weight: bold;
+        }
+        ColorKey:pressed { background-color: #eee; }
+    """
     def __init__(self, char, parent=None):
         super().__init__(char, parent)
         self.char = char
         self.setFixedSize(45, 45)
         self.current_color = "#000000"
-        self.update_style()
+        self.pen_color = QColor(self.current_color)
     def set_synesthesia_color(self, hex_color):
         self.current_color = hex_color
-        self.update_style()
-    def update_style(self):
-        # Inline Style (Restored)
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: white; border: 1px solid #bbb; border-radius: 8px;
-                font-size: 20px; color: {self.current_color}; font-weight: bold;
-            }}
-            QPushButton:pressed {{ background-color: #eee; }}
-        """)
\ No newline at end of file
+        self.pen_color = QColor(hex_color)
+        self.update()
+    def paintEvent(self, event):
+        # Let the shared style draw the key, then the character in its own color
+        p = QStylePainter(self); opt = QStyleOptionButton(); self.initStyleOption(opt); opt.text = ""
+        p.drawControl(QStyle.CE_PushButton, opt)
+        p.setPen(self.pen_color); p.drawText(self.rect(), Qt.AlignCenter, self.char)